@@ -20,8 +20,11 @@ Usage:
 
 import argparse
 import glob
+import math
 import sys
+from itertools import chain
 from pathlib import Path
+from typing import List
 
 # Import our modular components
 try:
@@ -64,6 +67,11 @@ Examples:
                        action='store_true',
                        help='Remove duplicate POIs from target file')
 
+    parser.add_argument('--distance-threshold',
+                       type=float,
+                       default=100.0,
+                       help='Distance in meters for duplicate detection (default: 100.0)')
+
     # Enhancement arguments
     parser.add_argument('--elevation-lookup',
                        action='store_true',
@@ -109,9 +117,39 @@ def validate_arguments(args) -> bool:
         print("Error: Must specify at least one action (--add, --dedupe, etc.)")
         return False
 
+    if not (math.isfinite(args.distance_threshold) and args.distance_threshold > 0):
+        print("Error: --distance-threshold must be a positive number of meters")
+        return False
+
     return True
 
 
+def unique_source_files(source_files: List[Path]) -> List[Path]:
+    """Remove duplicate source files, preserving the original order.
+
+    Paths are compared by device and inode when available, so './a.gpx',
+    'a.gpx' and symlinks to the same file are only read once. This stat()
+    is the only existence check before reading, so files that cannot be
+    stat'ed are reported and dropped here.
+    """
+    seen = set()
+    unique_files = []
+
+    for file_path in source_files:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            print(f"File not found: {file_path}")
+            continue
+        key = (stat.st_dev, stat.st_ino) if stat.st_ino else file_path.resolve()
+
+        if key not in seen:
+            seen.add(key)
+            unique_files.append(file_path)
+
+    return unique_files
+
+
 def main():
     """Main application entry point."""
     parser = create_argument_parser()
@@ -123,6 +161,7 @@ def main():
 
     # Initialize GPX manager
     gpx_manager = GPXManager()
+    gpx_manager.duplicate_threshold = args.distance_threshold
 
     # Load or create target file
     if args.target.exists():
@@ -136,14 +175,14 @@ def main():
 
     # Handle --add command
     if args.add:
-        # Expand glob patterns
+        # Expand glob patterns; matches come from directory listings and are
+        # stat'ed once by unique_source_files, not again before reading
         source_files = []
         for pattern in args.add.split(','):
             pattern = pattern.strip()
-            matches = glob.glob(pattern)
-            if matches:
-                source_files.extend([Path(f) for f in matches])
-            else:
+            matches_before = len(source_files)
+            source_files.extend(Path(f) for f in glob.iglob(pattern, recursive=True))
+            if len(source_files) == matches_before:
                 # Try as direct file path
                 file_path = Path(pattern)
                 if file_path.exists():
@@ -151,28 +190,23 @@ def main():
                 else:
                     print(f"Warning: No files found matching pattern: {pattern}")
 
+        # Drop files matched by more than one pattern so each is parsed once
+        source_files = unique_source_files(source_files)
+
         if args.verbose:
             print(f"Processing {len(source_files)} source files:")
             for file_path in source_files:
                 print(f"  - {file_path}")
 
-        # Load POIs from all source files
-        all_source_pois = []
-        total_loaded = 0
-
-        for source_file in source_files:
-            if not source_file.exists():
-                print(f"Warning: Source file {source_file} not found, skipping")
-                continue
+        # Load POIs from all source files, in parallel for larger batches
+        pois_per_file = gpx_manager.read_many(source_files)
 
-            file_pois = gpx_manager.read_gpx_file(source_file)
-            all_source_pois.extend(file_pois)
-            total_loaded += len(file_pois)
-
-            if args.verbose:
-                print(f"Loaded {len(file_pois)} POIs from {source_file}")
+        all_source_pois = list(chain.from_iterable(pois_per_file))
+        total_loaded = len(all_source_pois)
 
         if args.verbose:
+            for source_file, file_pois in zip(source_files, pois_per_file):
+                print(f"Loaded {len(file_pois)} POIs from {source_file}")
             print(f"Total loaded: {total_loaded} POIs from {len(source_files)} files")
 
         # Merge all POIs using optimized algorithm
@@ -226,12 +260,16 @@ def main():
     # Handle --garmin-optimize command
     if args.garmin_optimize:
         print("Optimizing for Garmin devices...")
-        current_pois = gpx_manager.garmin_optimize(current_pois)
-        print("Garmin optimization completed")
-
-        # Write optimized GPX file
         optimized_path = args.target.with_suffix('.garmin.gpx')
-        gpx_manager.write_garmin_optimized_gpx(optimized_path, current_pois)
+        if args.export_garmin_poi or args.export_kml:
+            # The exports below read the optimized POIs again
+            current_pois = gpx_manager.garmin_optimize(current_pois)
+            gpx_manager.write_garmin_optimized_gpx(optimized_path, current_pois)
+        else:
+            # Nothing else reads them, so stream them straight into the file
+            gpx_manager.write_garmin_optimized_gpx(optimized_path,
+                                                   gpx_manager.garmin_optimize_iter(current_pois))
+        print("Garmin optimization completed")
         print(f"Created Garmin-optimized file: {optimized_path}")
 
     # Handle export commands
@@ -6,13 +6,74 @@ This module contains the POI class and spatial indexing utilities
 for high-performance POI operations.
 """
 
+import importlib.util
 import math
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
 from typing import Dict, List, Optional, Set, Tuple
 
+# Optional NumPy support for vectorized distance calculations
+try:
+    import numpy as np
+    NUMPY_SUPPORT = True
+except ImportError:
+    NUMPY_SUPPORT = False
 
-@dataclass
+# Optional Numba-compiled kernels (poi_kernels), which take NumPy arrays.
+# Importing Numba costs more than most runs spend on distance checks, so
+# _kernels() imports them the first time a query has enough candidates
+NUMBA_SUPPORT = NUMPY_SUPPORT and importlib.util.find_spec('numba') is not None
+
+EARTH_RADIUS_METERS = 6371000.0
+
+# Below this distance the equirectangular approximation is accurate to well
+# under a meter, so duplicate checks can skip the Haversine transcendentals
+SHORT_DISTANCE_METERS = 1000.0
+
+# Candidate count from which one vectorized NumPy call beats per-pair math
+VECTORIZE_MIN_CANDIDATES = 64
+
+# Candidate count from which a compiled Numba kernel beats per-pair math
+KERNEL_MIN_CANDIDATES = 32
+
+
+def _kernels():
+    """The poi_kernels module, imported on first use, or None if Numba fails to load."""
+    global NUMBA_SUPPORT
+    import poi_kernels
+    if not poi_kernels.NUMBA_SUPPORT:
+        NUMBA_SUPPORT = False
+        return None
+    return poi_kernels
+
+
+def _haversine_term(lat1: float, lon1: float, cos_lat1: float,
+                    lat2: float, lon2: float, cos_lat2: float) -> float:
+    """The Haversine 'a' term, sin^2 of half the central angle between two points."""
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    return math.sin(dlat/2)**2 + cos_lat1 * cos_lat2 * math.sin(dlon/2)**2
+
+
+def haversine_term_limit(distance_meters: float) -> float:
+    """The Haversine 'a' term at distance_meters, for threshold tests without atan2/sqrt."""
+    return math.sin(min(distance_meters / (2 * EARTH_RADIUS_METERS), math.pi / 2)) ** 2
+
+
+def _haversine_rad(lat1: float, lon1: float, cos_lat1: float,
+                   lat2: float, lon2: float, cos_lat2: float) -> float:
+    """Haversine distance in meters between points in radians, given their latitude cosines."""
+    a = _haversine_term(lat1, lon1, cos_lat1, lat2, lon2, cos_lat2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+
+    return EARTH_RADIUS_METERS * c
+
+
+@dataclass(slots=True)
 class POI:
     """Represents a Point of Interest from a GPX file"""
     lat: float
@@ -23,63 +84,170 @@ class POI:
     link: Optional[str] = None
     extensions: Optional[str] = None  # Raw XML string of extensions element
 
+    # Derived values cached for the distance and merge hot paths
+    _lat_rad: float = field(init=False, repr=False, compare=False)
+    _lon_rad: float = field(init=False, repr=False, compare=False)
+    _cos_lat: float = field(init=False, repr=False, compare=False)
+    _name_key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._refresh_cache()
+
+    def _refresh_cache(self):
+        """Recompute cached derived values after coordinates or name change."""
+        self._lat_rad = math.radians(self.lat)
+        self._lon_rad = math.radians(self.lon)
+        self._cos_lat = math.cos(self._lat_rad)
+        self._name_key = self.name.lower()
+
     def distance_to(self, other: 'POI') -> float:
         """Calculate distance between two POIs using Haversine formula (in meters)"""
-        R = 6371000  # Earth's radius in meters
+        return _haversine_rad(self._lat_rad, self._lon_rad, self._cos_lat,
+                              other._lat_rad, other._lon_rad, other._cos_lat)
+
+    def distance_to_many(self, lats: 'np.ndarray', lons: 'np.ndarray') -> 'np.ndarray':
+        """Haversine distances (in meters) from this POI to arrays of coordinates in degrees"""
+        return self._distance_to_many_rad(np.radians(lats), np.radians(lons))
+
+    def _distance_to_many_rad(self, lat2_rad: 'np.ndarray', lon2_rad: 'np.ndarray') -> 'np.ndarray':
+        """distance_to_many for coordinates already in radians"""
+        dlat = lat2_rad - self._lat_rad
+        dlon = lon2_rad - self._lon_rad
+
+        a = np.sin(dlat / 2) ** 2 + self._cos_lat * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        return EARTH_RADIUS_METERS * c
+
+    def distance_sq_to(self, other: 'POI') -> float:
+        """Squared equirectangular distance in square meters (short distances only)"""
+        dlon = other._lon_rad - self._lon_rad
+        if dlon > math.pi:
+            dlon -= 2 * math.pi
+        elif dlon < -math.pi:
+            dlon += 2 * math.pi
+
+        # Mean of the cached cosines stands in for cos(mean latitude)
+        x = dlon * (self._cos_lat + other._cos_lat) * 0.5
+        y = other._lat_rad - self._lat_rad
+        return (x * x + y * y) * (EARTH_RADIUS_METERS * EARTH_RADIUS_METERS)
+
+    def distance_to_fast(self, other: 'POI') -> float:
+        """Equirectangular distance in meters; accurate for distances under SHORT_DISTANCE_METERS"""
+        return math.sqrt(self.distance_sq_to(other))
+
+    def distance_to_many_fast(self, lats: 'np.ndarray', lons: 'np.ndarray') -> 'np.ndarray':
+        """Vectorized distance_to_fast to arrays of coordinates in degrees"""
+        return self._distance_to_many_fast_rad(np.radians(lats), np.radians(lons))
+
+    def _distance_to_many_fast_rad(self, lat2_rad: 'np.ndarray', lon2_rad: 'np.ndarray') -> 'np.ndarray':
+        """distance_to_many_fast for coordinates already in radians"""
+        dlon = lon2_rad - self._lon_rad
+        dlon = (dlon + math.pi) % (2 * math.pi) - math.pi
+
+        x = dlon * (self._cos_lat + np.cos(lat2_rad)) * 0.5
+        y = lat2_rad - self._lat_rad
+        return EARTH_RADIUS_METERS * np.sqrt(x * x + y * y)
+
+    def is_duplicate(self, other: 'POI', distance_threshold: float = 100.0,
+                     threshold_sq: Optional[float] = None,
+                     haversine_limit: Optional[float] = None) -> bool:
+        """Check if two POIs are duplicates based on distance threshold.
+
+        Callers doing many checks with the same threshold can pass the
+        precomputed threshold_sq (short thresholds) and haversine_limit
+        (longer ones, see haversine_term_limit) to skip deriving them per call.
+        """
+        if distance_threshold < SHORT_DISTANCE_METERS:
+            if threshold_sq is None:
+                threshold_sq = distance_threshold * distance_threshold
+            return self.distance_sq_to(other) <= threshold_sq
+        if haversine_limit is None:
+            haversine_limit = haversine_term_limit(distance_threshold)
+        # Reject from plain differences first (see SpatialGrid._measure_candidates)
+        cos_product = self._cos_lat * other._cos_lat
+        dlat = other._lat_rad - self._lat_rad
+        dlon = other._lon_rad - self._lon_rad
+        wrapped_dlon = abs(dlon)
+        if wrapped_dlon > math.pi:
+            wrapped_dlon = 2 * math.pi - wrapped_dlon
+        if dlat * dlat + cos_product * wrapped_dlon * wrapped_dlon > math.pi * math.pi * haversine_limit:
+            return False
+        # Compare the Haversine term itself, skipping atan2 and both sqrts
+        return math.sin(dlat/2)**2 + cos_product * math.sin(dlon/2)**2 <= haversine_limit
+
+    def _merged_fields(self, other: 'POI') -> Tuple:
+        """Field values of the merge of this POI with another, preferring more complete data"""
+        self_name, other_name = self.name, other.name
+        self_desc, other_desc = self.desc, other.desc
+        self_ele, other_ele = self.ele, other.ele
+        self_ext, other_ext = self.extensions, other.extensions
 
-        lat1_rad = math.radians(self.lat)
-        lon1_rad = math.radians(self.lon)
-        lat2_rad = math.radians(other.lat)
-        lon2_rad = math.radians(other.lon)
-
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
+        # Choose the better name (longer or non-generic)
+        if len(other_name) > len(self_name) or 'waypoint' in self._name_key:
+            name = other_name
+        else:
+            name = self_name
 
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        # Choose the better description (longer)
+        desc = self_desc if len(self_desc) > len(other_desc) else other_desc
 
-        return R * c
+        # Choose extensions if available (prefer the one with more data)
+        if other_ext and (not self_ext or len(other_ext) > len(self_ext)):
+            extensions = other_ext
+        else:
+            extensions = self_ext
+
+        # Choose elevation and coordinates from the POI with elevation data,
+        # otherwise average the coordinates
+        if self_ele is not None:
+            ele = self_ele
+            if other_ele is None:
+                lat, lon = self.lat, self.lon
+            else:
+                lat, lon = (self.lat + other.lat) / 2, (self.lon + other.lon) / 2
+        else:
+            ele = other_ele
+            if other_ele is not None:
+                lat, lon = other.lat, other.lon
+            else:
+                lat, lon = (self.lat + other.lat) / 2, (self.lon + other.lon) / 2
 
-    def is_duplicate(self, other: 'POI', distance_threshold: float = 100.0) -> bool:
-        """Check if two POIs are duplicates based on distance threshold"""
-        if self.distance_to(other) <= distance_threshold:
-            return True
-        return False
+        return lat, lon, name, desc, ele, self.link or other.link, extensions
 
     def merge_with(self, other: 'POI') -> 'POI':
         """Merge this POI with another, preferring more complete data"""
-        # Choose the better name (longer or non-generic)
-        name = self.name
-        if len(other.name) > len(self.name) or 'waypoint' in self.name.lower():
-            name = other.name
+        return POI(*self._merged_fields(other))
 
-        # Choose the better description (longer)
-        desc = self.desc if len(self.desc) > len(other.desc) else other.desc
+    def merge_inplace(self, other: 'POI'):
+        """Merge another POI into this one, updating it in place"""
+        if other == self:
+            # Identical POI (e.g. the same file imported twice): nothing to merge
+            return
 
-        # Choose elevation data if available
-        ele = self.ele if self.ele is not None else other.ele
+        old_lat, old_lon, old_name = self.lat, self.lon, self.name
+        (self.lat, self.lon, self.name, self.desc, self.ele,
+         self.link, self.extensions) = self._merged_fields(other)
 
-        # Choose link if available
-        link = self.link if self.link else other.link
+        if self.lat != old_lat or self.lon != old_lon or self.name != old_name:
+            self._refresh_cache()
 
-        # Choose extensions if available (prefer the one with more data)
-        extensions = self.extensions
-        if not extensions and other.extensions:
-            extensions = other.extensions
-        elif extensions and other.extensions and len(other.extensions) > len(extensions):
-            extensions = other.extensions
-
-        # Choose coordinates from the POI with elevation data
-        if self.ele is not None and other.ele is None:
-            lat, lon = self.lat, self.lon
-        elif other.ele is not None and self.ele is None:
-            lat, lon = other.lat, other.lon
-        else:
-            # Average the coordinates
-            lat = (self.lat + other.lat) / 2
-            lon = (self.lon + other.lon) / 2
 
-        return POI(lat=lat, lon=lon, name=name, desc=desc, ele=ele, link=link, extensions=extensions)
+# The 3x3 block of cells around (and including) a query cell
+_NEIGHBOR_OFFSETS = tuple((dlat, dlon) for dlat in (-1, 0, 1) for dlon in (-1, 0, 1))
+
+# Longitude reach (in cells) above which a query scans the occupied cells of
+# each latitude row instead of looking up every cell offset
+ROW_SCAN_MIN_REACH = 5
+
+
+@lru_cache(maxsize=256)
+def _neighbor_offsets(reach_lat: int, reach_lon: int) -> Tuple[Tuple[int, int], ...]:
+    """Cell offsets within reach_lat rows and reach_lon columns, row by row."""
+    if reach_lat <= 1 and reach_lon <= 1:
+        return _NEIGHBOR_OFFSETS
+    return tuple((dl, dn) for dl in range(-reach_lat, reach_lat + 1)
+                 for dn in range(-reach_lon, reach_lon + 1))
 
 
 class SpatialGrid:
@@ -92,83 +260,263 @@ class SpatialGrid:
         self.cell_size_meters = cell_size_meters
         # Convert meters to degrees (approximate)
         self.cell_size_degrees = cell_size_meters / 111320.0  # ~111.32km per degree
+        # Cell lookups multiply by the reciprocal instead of dividing
+        self._inv_cell_deg = 1.0 / self.cell_size_degrees
         self.grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
-        self.pois: List[POI] = []
+        # Occupied longitude cells of each latitude row, for queries whose
+        # ring of cells is mostly empty (near the poles, large radii). Rows
+        # are appended to as cells fill and sorted when a query next reads them
+        self._rows: Dict[int, List[int]] = defaultdict(list)
+        self._unsorted_rows: Set[int] = set()
+
+        # Structure-of-arrays storage: contiguous float64 coordinates (radians,
+        # converted once at insertion) by index for the distance scans, POI
+        # objects only for returning metadata
+        self._lat_rad = array('d')
+        self._lon_rad = array('d')
+        self._meta: List[Optional[POI]] = []
 
     def _get_grid_coords(self, lat: float, lon: float) -> Tuple[int, int]:
         """Convert lat/lon to grid coordinates."""
-        grid_lat = int(lat / self.cell_size_degrees)
-        grid_lon = int(lon / self.cell_size_degrees)
-        return (grid_lat, grid_lon)
-
-    def _get_neighbor_cells(self, grid_lat: int, grid_lon: int) -> List[Tuple[int, int]]:
-        """Get all neighboring grid cells (including the center cell)."""
-        neighbors = []
-        for dlat in [-1, 0, 1]:
-            for dlon in [-1, 0, 1]:
-                neighbors.append((grid_lat + dlat, grid_lon + dlon))
-        return neighbors
+        inv_cell_deg = self._inv_cell_deg
+        return (int(lat * inv_cell_deg), int(lon * inv_cell_deg))
+
+    def _get_reach(self, lat: float, max_distance_meters: float) -> Tuple[int, int]:
+        """Rows and columns of cells to scan so that every POI within max_distance is covered."""
+        # Longitude cells shrink towards the poles, so a search near the pole
+        # (or with a radius larger than a cell) needs a wider ring of cells
+        dlat = math.degrees(max_distance_meters / EARTH_RADIUS_METERS)
+        cos_edge = math.cos(math.radians(min(abs(lat) + dlat, 90.0)))
+        dlon = dlat / cos_edge if cos_edge > 1e-9 else 180.0
+        reach_lat = math.ceil(dlat / self.cell_size_degrees)
+        reach_lon = math.ceil(min(dlon, 180.0) / self.cell_size_degrees)
+        return reach_lat, reach_lon
 
     def add_poi(self, poi: POI, index: int):
         """Add POI to spatial index."""
         grid_coords = self._get_grid_coords(poi.lat, poi.lon)
-        self.grid[grid_coords].append(index)
-
-        # Store POI reference
-        if len(self.pois) <= index:
-            self.pois.extend([None] * (index - len(self.pois) + 1))  # type: ignore
-        self.pois[index] = poi
+        bucket = self.grid[grid_coords]
+        if not bucket:
+            self._rows[grid_coords[0]].append(grid_coords[1])
+            self._unsorted_rows.add(grid_coords[0])
+        bucket.append(index)
+
+        # Store coordinates and POI reference (arrays over-allocate on growth)
+        if index >= len(self._meta):
+            padding = index + 1 - len(self._meta)
+            self._lat_rad.extend(array('d', [0.0]) * padding)
+            self._lon_rad.extend(array('d', [0.0]) * padding)
+            self._meta.extend([None] * padding)
+        self._lat_rad[index] = poi._lat_rad
+        self._lon_rad[index] = poi._lon_rad
+        self._meta[index] = poi
+
+    def bulk_load(self, pois: List[POI], start_index: int = 0):
+        """
+        Add pois at consecutive indices from start_index. Same result as
+        calling add_poi for each in turn, but the coordinate arrays are
+        written as slices and the cell lookups run in one loop.
+        """
+        end_index = start_index + len(pois)
+        if end_index > len(self._meta):
+            padding = end_index - len(self._meta)
+            self._lat_rad.extend(array('d', [0.0]) * padding)
+            self._lon_rad.extend(array('d', [0.0]) * padding)
+            self._meta.extend([None] * padding)
+        self._lat_rad[start_index:end_index] = array('d', [poi._lat_rad for poi in pois])
+        self._lon_rad[start_index:end_index] = array('d', [poi._lon_rad for poi in pois])
+        self._meta[start_index:end_index] = pois
+
+        grid = self.grid
+        rows = self._rows
+        unsorted_rows = self._unsorted_rows
+        inv_cell_deg = self._inv_cell_deg
+        for index, poi in enumerate(pois, start_index):
+            cell_lat, cell_lon = int(poi.lat * inv_cell_deg), int(poi.lon * inv_cell_deg)
+            bucket = grid[(cell_lat, cell_lon)]
+            if not bucket:
+                rows[cell_lat].append(cell_lon)
+                unsorted_rows.add(cell_lat)
+            bucket.append(index)
 
     def find_nearby_pois(self, poi: POI, max_distance_meters: float = 100) -> List[Tuple[int, float]]:
-        """Find POIs within max_distance of the given POI."""
-        grid_coords = self._get_grid_coords(poi.lat, poi.lon)
-        neighbor_cells = self._get_neighbor_cells(*grid_coords)
-
-        nearby = []
-        for cell_coords in neighbor_cells:
-            if cell_coords in self.grid:
-                for poi_index in self.grid[cell_coords]:
-                    if poi_index < len(self.pois) and self.pois[poi_index] is not None:
-                        candidate_poi = self.pois[poi_index]
-                        distance = poi.distance_to(candidate_poi)
-                        if distance <= max_distance_meters:
-                            nearby.append((poi_index, distance))
-
-        return sorted(nearby, key=lambda x: x[1])  # Sort by distance
-
-
-class DistanceCache:
-    """LRU cache for expensive distance calculations."""
-
-    def __init__(self, max_size: int = 10000):
-        self.cache: Dict[Tuple[float, float, float, float], float] = {}
-        self.access_order: List[Tuple[float, float, float, float]] = []
-        self.max_size = max_size
-
-    def get_distance(self, poi1: POI, poi2: POI) -> float:
-        """Get cached distance or calculate and cache it."""
-        # Create cache key (normalize to ensure consistent ordering)
-        if poi1.lat < poi2.lat or (poi1.lat == poi2.lat and poi1.lon < poi2.lon):
-            key = (poi1.lat, poi1.lon, poi2.lat, poi2.lon)
+        """
+        Find POIs within max_distance of the given POI, nearest first.
+        Returns a list of (index, distance) tuples.
+        """
+        candidates = self._gather_candidates(poi, max_distance_meters)
+        return self._measure_candidates(poi, candidates, max_distance_meters)
+
+    def find_nearest_poi(self, poi: POI, max_distance_meters: float = 100) -> int:
+        """
+        Index of the POI nearest to the given POI within max_distance, or -1.
+        Same result as the first entry of find_nearby_pois, without measuring
+        and sorting every candidate in Python.
+        """
+        candidates = self._gather_candidates(poi, max_distance_meters)
+        short = max_distance_meters < SHORT_DISTANCE_METERS
+
+        kernels = NUMBA_SUPPORT and len(candidates) >= KERNEL_MIN_CANDIDATES and _kernels()
+        if kernels:
+            return kernels.nearest_duplicate(poi._lat_rad, poi._lon_rad,
+                                             np.frombuffer(self._lat_rad, dtype=np.float64),
+                                             np.frombuffer(self._lon_rad, dtype=np.float64),
+                                             np.array(candidates, dtype=np.intp),
+                                             EARTH_RADIUS_METERS, max_distance_meters, short)
+        if short:
+            nearest, nearest_sq = -1, math.inf
+            meta = self._meta
+            max_distance_sq = max_distance_meters * max_distance_meters
+            for poi_index in candidates:
+                distance_sq = poi.distance_sq_to(meta[poi_index])
+                if distance_sq <= max_distance_sq and distance_sq < nearest_sq:
+                    nearest, nearest_sq = poi_index, distance_sq
+            return nearest
+
+        nearby = self._measure_candidates(poi, candidates, max_distance_meters)
+        return nearby[0][0] if nearby else -1
+
+    def _gather_candidates(self, poi: POI, max_distance_meters: float) -> List[int]:
+        """Indices of all POIs in the cells around poi."""
+        grid_lat, grid_lon = self._get_grid_coords(poi.lat, poi.lon)
+
+        reach_lat, reach_lon = self._get_reach(poi.lat, max_distance_meters)
+
+        candidates = []
+        get_cell = self.grid.get
+        if reach_lon <= ROW_SCAN_MIN_REACH:
+            for dlat, dlon in _neighbor_offsets(reach_lat, reach_lon):
+                bucket = get_cell((grid_lat + dlat, grid_lon + dlon))
+                if bucket is not None:
+                    candidates.extend(bucket)
+            return candidates
+
+        # Wide ring (up to the whole latitude band near the poles): visit only
+        # the occupied cells in range, in the same order as the offsets would
+        get_row = self._rows.get
+        unsorted_rows = self._unsorted_rows
+        for cell_lat in range(grid_lat - reach_lat, grid_lat + reach_lat + 1):
+            row = get_row(cell_lat)
+            if row:
+                if cell_lat in unsorted_rows:
+                    row.sort()
+                    unsorted_rows.discard(cell_lat)
+                start = bisect_left(row, grid_lon - reach_lon)
+                end = bisect_right(row, grid_lon + reach_lon)
+                for cell_lon in row[start:end]:
+                    candidates.extend(get_cell((cell_lat, cell_lon)))
+        return candidates
+
+    def _measure_candidates(self, poi: POI, candidates: List[int],
+                            max_distance_meters: float) -> List[Tuple[int, float]]:
+        """Distances to candidates within max_distance, nearest first."""
+        # Short radii use the equirectangular approximation (no trigonometry
+        # per pair, since both cosines are cached); longer ones use Haversine
+        short = max_distance_meters < SHORT_DISTANCE_METERS
+
+        # Vectorized paths produce found_* arrays, scalar paths a nearby list
+        nearby = None
+        kernels = NUMBA_SUPPORT and len(candidates) >= KERNEL_MIN_CANDIDATES and _kernels()
+        if kernels:
+            # Compiled kernel reads the coordinate arrays in place
+            indices = np.array(candidates, dtype=np.intp)
+            distances = np.empty(len(candidates), dtype=np.float64)
+            kernel = kernels.equirectangular_block if short else kernels.haversine_block
+            kernel(poi._lat_rad, poi._lon_rad,
+                   np.frombuffer(self._lat_rad, dtype=np.float64),
+                   np.frombuffer(self._lon_rad, dtype=np.float64),
+                   indices, EARTH_RADIUS_METERS, distances)
+            within = distances <= max_distance_meters
+            found_indices, found_distances = indices[within], distances[within]
+        elif NUMPY_SUPPORT and len(candidates) >= VECTORIZE_MIN_CANDIDATES:
+            # One vectorized pass over all candidates instead of per-pair calls
+            indices = np.array(candidates, dtype=np.intp)
+            lat_rad = np.frombuffer(self._lat_rad, dtype=np.float64)[indices]
+            lon_rad = np.frombuffer(self._lon_rad, dtype=np.float64)[indices]
+            if short:
+                distances = poi._distance_to_many_fast_rad(lat_rad, lon_rad)
+            else:
+                distances = poi._distance_to_many_rad(lat_rad, lon_rad)
+            within = distances <= max_distance_meters
+            found_indices, found_distances = indices[within], distances[within]
+        elif short:
+            nearby = []
+            meta = self._meta
+            max_distance_sq = max_distance_meters * max_distance_meters
+            for poi_index in candidates:
+                distance_sq = poi.distance_sq_to(meta[poi_index])
+                if distance_sq <= max_distance_sq:
+                    nearby.append((poi_index, math.sqrt(distance_sq)))
         else:
-            key = (poi2.lat, poi2.lon, poi1.lat, poi1.lon)
-
-        if key in self.cache:
-            # Move to end (most recently used)
-            self.access_order.remove(key)
-            self.access_order.append(key)
-            return self.cache[key]
-
-        # Calculate distance
-        distance = poi1.distance_to(poi2)
-
-        # Add to cache
-        self.cache[key] = distance
-        self.access_order.append(key)
+            nearby = []
+            meta = self._meta
+            # Since sin(x) >= 2x/pi on [0, pi/2], the Haversine term is at least
+            # (dlat^2 + cos1*cos2*dlon^2) / pi^2. Candidates failing that bound
+            # are rejected from plain differences, without any trigonometry
+            limit = haversine_term_limit(max_distance_meters)
+            bound = math.pi * math.pi * limit
+            lat0, lon0, cos0 = poi._lat_rad, poi._lon_rad, poi._cos_lat
+            for poi_index in candidates:
+                other = meta[poi_index]
+                dlat = other._lat_rad - lat0
+                dlon = abs(other._lon_rad - lon0)
+                if dlon > math.pi:
+                    dlon = 2 * math.pi - dlon
+                if dlat * dlat + cos0 * other._cos_lat * dlon * dlon > bound:
+                    continue
+
+                # Threshold test on the 'a' term; atan2 only for accepted POIs
+                a = _haversine_term(lat0, lon0, cos0, other._lat_rad, other._lon_rad, other._cos_lat)
+                if a <= limit:
+                    distance = EARTH_RADIUS_METERS * (2 * math.atan2(math.sqrt(a), math.sqrt(1-a)))
+                    nearby.append((poi_index, distance))
+
+        if nearby is None:
+            # Stable, like list.sort, so equal distances keep candidate order
+            order = np.argsort(found_distances, kind='stable')
+            return list(zip(found_indices[order].tolist(), found_distances[order].tolist()))
+
+        nearby.sort(key=itemgetter(1))  # Sort by distance
+        return nearby
+
+
+class LatitudeIndex:
+    """
+    Latitude-sorted index for sweep-line proximity searches.
+    Used where a grid is not worth building (small or very sparse data):
+    only POIs inside the latitude band of the search radius are checked.
+    """
 
-        # Maintain cache size
-        if len(self.cache) > self.max_size:
-            oldest = self.access_order.pop(0)
-            del self.cache[oldest]
+    def __init__(self, pois: Optional[List[POI]] = None):
+        entries = sorted((poi.lat, i) for i, poi in enumerate(pois or []))
+        self._lats: List[float] = [lat for lat, _ in entries]
+        self._indices: List[int] = [i for _, i in entries]
 
-        return distance
+    def add_poi(self, poi: POI, index: int):
+        """Add POI to the index, keeping latitude order."""
+        pos = bisect_right(self._lats, poi.lat)
+        self._lats.insert(pos, poi.lat)
+        self._indices.insert(pos, index)
+
+    def move_poi(self, index: int, old_lat: float, new_lat: float):
+        """Re-position a POI whose latitude changed (e.g. after a merge)."""
+        if old_lat == new_lat:
+            return
+        pos = bisect_left(self._lats, old_lat)
+        while self._indices[pos] != index:
+            pos += 1
+        del self._lats[pos]
+        del self._indices[pos]
+
+        pos = bisect_right(self._lats, new_lat)
+        self._lats.insert(pos, new_lat)
+        self._indices.insert(pos, index)
+
+    def find_candidates(self, poi: POI, max_distance_meters: float = 100) -> List[int]:
+        """Return indices of POIs whose latitude is within max_distance, in index order."""
+        # Great-circle distance is never shorter than the latitude difference;
+        # the small margin absorbs floating point rounding at the boundary
+        dlat = math.degrees(max_distance_meters / EARTH_RADIUS_METERS) * (1 + 1e-9)
+        lo = bisect_left(self._lats, poi.lat - dlat)
+        hi = bisect_right(self._lats, poi.lat + dlat)
+        return sorted(self._indices[lo:hi])
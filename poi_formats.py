@@ -8,20 +8,35 @@ This module contains classes for reading and writing different POI file formats:
 - CSV/KML export formats
 """
 
+import copy
 import csv
 import glob
 import json
+import os
 import re
+import shutil
+import threading
 import time
-import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin, urlparse
 
 import requests
 
 from poi_core import POI
 
+# Optional lxml support for faster XML parsing and serialization; the
+# standard library ElementTree provides the same API as a fallback
+try:
+    from lxml import etree as ET
+    LXML_SUPPORT = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_SUPPORT = False
+
 # Optional FIT file support
 try:
     from fitparse import FitFile
@@ -30,70 +45,288 @@ except ImportError:
     FIT_SUPPORT = False
 
 
-class GPXFileHandler:
-    """Handles reading and writing GPX files."""
-
-    def __init__(self):
-        self.namespaces = {
-            'gpx': 'http://www.topografix.com/GPX/1/1'
-        }
+# GPX 1.1 tags in Clark notation, resolved once instead of per lookup
+_GPX_NS = '{http://www.topografix.com/GPX/1/1}'
+_WPT = _GPX_NS + 'wpt'
+_NAME = _GPX_NS + 'name'
+_DESC = _GPX_NS + 'desc'
+_ELE = _GPX_NS + 'ele'
+_LINK = _GPX_NS + 'link'
+_EXTENSIONS = _GPX_NS + 'extensions'
+
+# Namespaces declared by the writers
+_XSI_URI = 'http://www.w3.org/2001/XMLSchema-instance'
+_WPTX1_URI = 'http://www.garmin.com/xmlschemas/WaypointExtension/v1'
+
+# Stored extension fragments keep their indentation text under the stdlib
+# writer; lxml only re-indents them if that whitespace is dropped on parse
+_FRAGMENT_PARSER = ET.XMLParser(remove_blank_text=True) if LXML_SUPPORT else None
+
+
+def _new_root(tag: str, nsmap: Dict[str, str], schema_location: Optional[str] = None) -> ET.Element:
+    """Create a root element declaring nsmap (the '' prefix is the default namespace)"""
+    if LXML_SUPPORT:
+        root = ET.Element(tag, nsmap={prefix or None: uri for prefix, uri in nsmap.items()})
+        if schema_location:
+            root.set(f'{{{_XSI_URI}}}schemaLocation', schema_location)
+    else:
+        # ElementTree has no namespace map; write the declarations literally
+        root = ET.Element(tag)
+        for prefix, uri in nsmap.items():
+            root.set(f'xmlns:{prefix}' if prefix else 'xmlns', uri)
+        if schema_location:
+            root.set('xsi:schemaLocation', schema_location)
+    return root
+
+
+def _wptx1(tag: str) -> str:
+    """Return the tag name for a Garmin WaypointExtension element"""
+    return f'{{{_WPTX1_URI}}}{tag}' if LXML_SUPPORT else f'wptx1:{tag}'
+
+
+def _parse_fragment(xml_string: str) -> ET.Element:
+    """Parse a stored XML fragment such as a POI's extensions"""
+    if LXML_SUPPORT:
+        return ET.fromstring(xml_string, _FRAGMENT_PARSER)
+    return ET.fromstring(xml_string)
+
+
+@lru_cache(maxsize=65536)
+def _parse_extensions_cached(xml_string: str) -> ET.Element:
+    """Parsed form of a POI's extensions string, shared by every write of that POI"""
+    return _parse_fragment(xml_string)
+
+
+def _extensions_element(xml_string: str) -> ET.Element:
+    """
+    Extensions element for a waypoint being written. Each distinct string is
+    parsed once; writers get a private copy (faster than re-parsing) because
+    they attach and re-indent it, and an lxml element can only have one parent.
+    """
+    return copy.deepcopy(_parse_extensions_cached(xml_string))
+
+
+# True if an element or one of its descendants is in a namespace (lxml only)
+_has_namespaced_element = ET.XPath('boolean(descendant-or-self::*[namespace-uri()])') if LXML_SUPPORT else None
+
+
+class _XMLFileWriter:
+    """
+    Writes an indented XML document through an lxml xmlfile.
+
+    Open elements stay open in the xmlfile and each child is written as
+    soon as the next one starts, so only one child subtree is held in
+    memory. Children are written node by node inside the open elements,
+    so a namespace an open element declares is not declared again below it.
+    """
+
+    def __init__(self, xf):
+        self._xf = xf
+        # Namespace URIs declared by each open element and its ancestors
+        self._scopes = [frozenset()]
+        self._pending: Optional[ET.Element] = None
+
+    @contextmanager
+    def element(self, element: ET.Element):
+        """Write element with the children it has so far, keeping it open for more"""
+        self._flush()
+        level = len(self._scopes) - 1
+        if level:
+            self._xf.write('\n' + '  ' * level)
+
+        scope = self._scopes[-1]
+        nsmap = {prefix: uri for prefix, uri in element.nsmap.items() if uri not in scope}
+        with self._xf.element(element.tag, element.attrib, nsmap=nsmap or None):
+            self._scopes.append(scope.union(nsmap.values()))
+            for child in list(element):
+                # Detached first, so the child does not inherit the
+                # declarations of element
+                element.remove(child)
+                self._write_child(child)
+            yield
+            self._flush()
+            self._scopes.pop()
+            self._xf.write('\n' + '  ' * level)
+
+    def subelement(self, tag: str) -> ET.Element:
+        """
+        Start a new child of the innermost open element. The child is
+        written later, so it must be complete before the next call.
+        """
+        self._flush()
+        self._pending = ET.Element(tag)
+        return self._pending
+
+    def _flush(self):
+        """Write the pending child, if any"""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self._write_child(pending)
+
+    def _write_child(self, child: ET.Element):
+        """Indent child and write it under the innermost open element"""
+        level = len(self._scopes) - 1
+        ET.indent(child, space="  ", level=level)
+        self._xf.write('\n' + '  ' * level)
+        self._write_node(child, self._scopes[-1])
+
+    def _write_node(self, node: ET.Element, scope: frozenset):
+        """
+        Write node and its subtree, declaring only namespaces missing from
+        scope; xmlfile picks the prefix the open elements already declare.
+        """
+        tag = node.tag
+        in_scope = node.nsmap
+        if not isinstance(tag, str) or not (in_scope or tag[0] == '{' or
+                                            len(node) and _has_namespaced_element(node)):
+            # Comments and subtrees with no namespaces at all are written as is
+            self._xf.write(node, with_tail=False)
+            return
+
+        nsmap = {prefix: uri for prefix, uri in in_scope.items() if uri not in scope}
+        if nsmap:
+            scope = scope.union(nsmap.values())
+        with self._xf.element(tag, node.attrib, nsmap=nsmap or None):
+            if node.text:
+                self._xf.write(node.text)
+            for child in node:
+                self._write_node(child, scope)
+                if child.tail:
+                    self._xf.write(child.tail)
+
+
+class _XMLTreeWriter:
+    """
+    ElementTree writer: builds the whole document and writes it once the
+    root element closes, declaring every namespace once on the root.
+    """
+
+    def __init__(self, out):
+        self._out = out
+        self._open: List[ET.Element] = []
+
+    @contextmanager
+    def element(self, element: ET.Element):
+        """Attach element (with the children it has so far) and open it for more"""
+        if self._open:
+            self._open[-1].append(element)
+        self._open.append(element)
+        yield
+        self._open.pop()
+        if not self._open:
+            self._use_root_prefixes(element)
+            ET.indent(element, space="  ", level=0)
+            ET.ElementTree(element).write(self._out, encoding='unicode')
+
+    def subelement(self, tag: str) -> ET.Element:
+        """Add a new child to the innermost open element"""
+        return ET.SubElement(self._open[-1], tag)
 
-    def read_gpx_file(self, file_path: Path) -> List[POI]:
-        """Read POIs from a GPX file"""
+    @staticmethod
+    def _use_root_prefixes(root: ET.Element):
+        """
+        Name parsed elements (extensions) with the prefixes the root declares
+        literally, so ElementTree does not declare those namespaces a second
+        time as ns0, ns1, ...
+        """
+        prefixes = {uri: key[6:] for key, uri in root.attrib.items()
+                    if key == 'xmlns' or key.startswith('xmlns:')}
+
+        def local_name(name):
+            if name[:1] == '{':
+                uri, local = name[1:].split('}', 1)
+                prefix = prefixes.get(uri)
+                if prefix is not None:
+                    return f'{prefix}:{local}' if prefix else local
+            return name
+
+        for elem in root.iter():
+            if isinstance(elem.tag, str):
+                elem.tag = local_name(elem.tag)
+            if elem.attrib:
+                for key in [key for key in elem.attrib if key[:1] == '{']:
+                    elem.set(local_name(key), elem.attrib.pop(key))
+
+
+@contextmanager
+def _xml_stream(file_path: Path):
+    """
+    Open file_path for XML output with a UTF-8 declaration. With lxml the
+    document is streamed through an xmlfile; ElementTree builds it whole.
+    The document is written to a temporary file in the same directory,
+    which replaces file_path only once it is complete, so an error while
+    writing leaves any existing file untouched.
+    """
+    # Write through symlinks, as opening the target directly would
+    target = Path(os.path.realpath(file_path))
+    temp_path = target.with_name(f'.{target.name}.{os.getpid()}-{threading.get_ident()}.tmp')
+    if LXML_SUPPORT:
+        out = open(temp_path, 'xb')
+    else:
+        out = open(temp_path, 'x', encoding='utf-8', errors='xmlcharrefreplace')
+    try:
+        with out:
+            if LXML_SUPPORT:
+                out.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+                with ET.xmlfile(out, encoding='utf-8') as xf:
+                    yield _XMLFileWriter(xf)
+            else:
+                out.write("<?xml version='1.0' encoding='utf-8'?>\n")
+                yield _XMLTreeWriter(out)
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+            # Keep the permissions of the file being replaced
+            shutil.copymode(target, temp_path)
+        except OSError:
+            pass
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
 
-            pois = []
 
-            # Find all waypoints with proper namespace handling
-            waypoints = root.findall('.//{http://www.topografix.com/GPX/1/1}wpt')
-            if not waypoints:
-                # Fallback: try without namespace for non-standard files
-                waypoints = root.findall('.//wpt')
+def _add_waypoint_extension(parent: ET.Element) -> ET.Element:
+    """Add a Garmin WaypointExtension element under parent"""
+    if LXML_SUPPORT:
+        # Waypoints are built detached from the root, so the element carries
+        # its prefix itself rather than falling back to ns0; the writer skips
+        # the declaration where the root already makes it
+        return ET.SubElement(parent, _wptx1('WaypointExtension'), nsmap={'wptx1': _WPTX1_URI})
+    return ET.SubElement(parent, _wptx1('WaypointExtension'))
 
-            for wpt in waypoints:
-                lat = float(wpt.get('lat') or '0')
-                lon = float(wpt.get('lon') or '0')
 
-                # Extract name - try with and without namespace
-                name_elem = wpt.find('name')
-                if name_elem is None:
-                    name_elem = wpt.find('.//{http://www.topografix.com/GPX/1/1}name')
-                name = name_elem.text.strip() if name_elem is not None and name_elem.text else ""
+# Name keywords per POI type, checked in order so the first matching type
+# wins. Each list is one compiled alternation, scanned in a single pass
+_POI_TYPE_PATTERNS = [
+    ('cabin', re.compile('hytte|cabin|hut|turisthytte|koie')),
+    ('peak', re.compile('topp|peak|summit|fjell|berg')),
+    ('lake', re.compile('vatn|lake|tjern|sjø')),
+]
 
-                # Extract description - try with and without namespace
-                desc_elem = wpt.find('desc')
-                if desc_elem is None:
-                    desc_elem = wpt.find('.//{http://www.topografix.com/GPX/1/1}desc')
-                desc = desc_elem.text.strip() if desc_elem is not None and desc_elem.text else ""
+# KML folder for each POI type
+_POI_TYPE_GROUPS = {
+    'cabin': 'Mountain Huts & Cabins',
+    'peak': 'Peaks & Summits',
+    'lake': 'Lakes & Water',
+    'default': 'Other Locations',
+}
 
-                # Extract elevation - try with and without namespace
-                ele_elem = wpt.find('ele')
-                if ele_elem is None:
-                    ele_elem = wpt.find('.//{http://www.topografix.com/GPX/1/1}ele')
-                ele = float(ele_elem.text) if ele_elem is not None and ele_elem.text else None
-
-                # Extract link - try with and without namespace
-                link_elem = wpt.find('link')
-                if link_elem is None:
-                    link_elem = wpt.find('.//{http://www.topografix.com/GPX/1/1}link')
-                link = link_elem.get('href') if link_elem is not None else None
+# Write buffer for CSV exports; large exports flush in few, big writes
+CSV_BUFFER_SIZE = 1024 * 1024
 
-                # Extract extensions - preserve original XML structure
-                extensions_elem = wpt.find('extensions')
-                if extensions_elem is None:
-                    extensions_elem = wpt.find('.//{http://www.topografix.com/GPX/1/1}extensions')
+# Below this many files, reading in the calling thread beats pool startup
+PARALLEL_READ_MIN_FILES = 4
 
-                extensions = None
-                if extensions_elem is not None:
-                    # Convert extensions element to string to preserve exact structure
-                    extensions = ET.tostring(extensions_elem, encoding='unicode', method='xml')
 
-                poi = POI(lat=lat, lon=lon, name=name or "", desc=desc or "", ele=ele, link=link, extensions=extensions)
-                pois.append(poi)
+class GPXFileHandler:
+    """Handles reading and writing GPX files."""
 
-            return pois
+    def read_gpx_file(self, file_path: Path) -> List[POI]:
+        """Read POIs from a GPX file"""
+        try:
+            return list(self._iter_waypoints(file_path))
 
         except ET.ParseError as e:
             print(f"Error parsing GPX file {file_path}: {e}")
@@ -102,69 +335,160 @@ class GPXFileHandler:
             print(f"Error reading GPX file {file_path}: {e}")
             return []
 
-    def write_gpx_file(self, file_path: Path, pois: List[POI]):
+    def read_gpx_file_iter(self, file_path: Path) -> Iterator[POI]:
+        """
+        Yield POIs from a GPX file as they are parsed, so callers that handle
+        one POI at a time never hold the whole file. On an error the message
+        is printed and iteration stops; POIs already yielded stay valid.
+        """
+        try:
+            yield from self._iter_waypoints(file_path)
+
+        except ET.ParseError as e:
+            print(f"Error parsing GPX file {file_path}: {e}")
+        except Exception as e:
+            print(f"Error reading GPX file {file_path}: {e}")
+
+    def _iter_waypoints(self, file_path: Path) -> Iterator[POI]:
+        """Parse waypoints one at a time; parse and I/O errors propagate"""
+        # Stream the file and only materialize one waypoint subtree at a
+        # time; everything else is discarded as soon as it is parsed
+        if LXML_SUPPORT:
+            # lxml filters on the tag in C, so only waypoints reach Python
+            for _, elem in ET.iterparse(str(file_path), events=('end',), tag=(_WPT, 'wpt')):
+                yield self._waypoint_to_poi(elem)
+                elem.clear()
+                # lxml keeps cleared siblings attached to the root
+                parent = elem.getparent()
+                while elem.getprevious() is not None:
+                    del parent[0]
+        else:
+            for _, elem in ET.iterparse(file_path, events=('end',)):
+                tag = elem.tag
+                if tag == _WPT or tag == 'wpt':
+                    yield self._waypoint_to_poi(elem)
+                    # Release the waypoint's children, attributes and text
+                    elem.clear()
+
+    def read_many(self, file_paths: List[Path], workers: Optional[int] = None,
+                  reader: Optional[Callable[[Path], List[POI]]] = None) -> List[List[POI]]:
+        """
+        Read several files in parallel, returning one POI list per file in
+        input order. reader defaults to read_gpx_file and must be picklable.
+        """
+        reader = reader or self.read_gpx_file
+        max_workers = workers or min(len(file_paths), os.cpu_count() or 1)
+        if len(file_paths) < PARALLEL_READ_MIN_FILES or max_workers < 2:
+            return [reader(file_path) for file_path in file_paths]
+
+        # Building POIs from parsed waypoints is Python code holding the GIL
+        # (even with lxml), so parallel reads need separate processes
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(reader, file_paths))
+
+    @staticmethod
+    def _waypoint_to_poi(wpt: ET.Element) -> POI:
+        """Build a POI from a parsed wpt element (namespaced or plain)"""
+        lat = float(wpt.get('lat') or '0')
+        lon = float(wpt.get('lon') or '0')
+
+        # A waypoint has only a handful of children, so one scan over
+        # them replaces separate namespaced and plain find() calls
+        name_elem = desc_elem = ele_elem = link_elem = extensions_elem = None
+        for child in wpt:
+            tag = child.tag
+            if tag == _NAME or tag == 'name':
+                if name_elem is None:
+                    name_elem = child
+            elif tag == _DESC or tag == 'desc':
+                if desc_elem is None:
+                    desc_elem = child
+            elif tag == _ELE or tag == 'ele':
+                if ele_elem is None:
+                    ele_elem = child
+            elif tag == _LINK or tag == 'link':
+                if link_elem is None:
+                    link_elem = child
+            elif tag == _EXTENSIONS or tag == 'extensions':
+                if extensions_elem is None:
+                    extensions_elem = child
+
+        name = name_elem.text.strip() if name_elem is not None and name_elem.text else ""
+        desc = desc_elem.text.strip() if desc_elem is not None and desc_elem.text else ""
+        ele = float(ele_elem.text) if ele_elem is not None and ele_elem.text else None
+        link = link_elem.get('href') if link_elem is not None else None
+
+        # Extract extensions - preserve original XML structure
+        extensions = None
+        if extensions_elem is not None:
+            # Convert extensions element to string to preserve exact structure
+            if LXML_SUPPORT:
+                # lxml would otherwise append the whitespace that follows the element
+                extensions = ET.tostring(extensions_elem, encoding='unicode', method='xml', with_tail=False)
+            else:
+                extensions = ET.tostring(extensions_elem, encoding='unicode', method='xml')
+
+        return POI(lat=lat, lon=lon, name=name, desc=desc, ele=ele, link=link, extensions=extensions)
+
+    def write_gpx_file(self, file_path: Path, pois: Iterable[POI]):
         """Write POIs to a GPX file with proper formatting"""
         # Create root GPX element with namespaces
-        root = ET.Element('gpx')
-        root.set('xmlns', 'http://www.topografix.com/GPX/1/1')
-        root.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        root.set('xsi:schemaLocation', 'http://www.topografix.com/GPX/1/1 http://www.topografix.com/GPX/1/1/gpx.xsd')
+        root = _new_root('gpx',
+                         {'': 'http://www.topografix.com/GPX/1/1', 'xsi': _XSI_URI},
+                         'http://www.topografix.com/GPX/1/1 http://www.topografix.com/GPX/1/1/gpx.xsd')
         root.set('version', '1.1')
         root.set('creator', 'poi-tool')
 
         # Add metadata
         metadata = ET.SubElement(root, 'metadata')
 
-        # Add POIs as waypoints
-        for poi in pois:
-            wpt = ET.SubElement(root, 'wpt')
-            wpt.set('lat', str(poi.lat))
-            wpt.set('lon', str(poi.lon))
-
-            # Add name
-            name_elem = ET.SubElement(wpt, 'name')
-            name_elem.text = poi.name
-
-            # Add description
-            desc_elem = ET.SubElement(wpt, 'desc')
-            desc_elem.text = poi.desc or ""
-
-            # Add elevation if available
-            if poi.ele is not None:
-                ele_elem = ET.SubElement(wpt, 'ele')
-                ele_elem.text = str(poi.ele)
-
-            # Add link if available
-            if poi.link:
-                link_elem = ET.SubElement(wpt, 'link')
-                link_elem.set('href', poi.link)
-
-            # Add original extensions if available
-            if poi.extensions:
-                try:
-                    # Parse the extensions XML string and add it to the waypoint
-                    extensions_element = ET.fromstring(poi.extensions)
-                    wpt.append(extensions_element)
-                except ET.ParseError:
-                    # If parsing fails, skip the extensions to avoid corrupting the file
-                    pass
-
-        # Create tree and write to file
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="  ", level=0)  # Pretty formatting
-        tree.write(file_path, encoding='utf-8', xml_declaration=True)
-
-    def write_garmin_optimized_gpx(self, file_path: Path, pois: List[POI]):
+        # Stream POIs to the file as waypoints, one element at a time;
+        # SubElement is bound locally for the hot loop
+        SubElement = ET.SubElement
+        with _xml_stream(file_path) as xml_out, xml_out.element(root):
+            for poi in pois:
+                wpt = xml_out.subelement('wpt')
+                wpt.set('lat', str(poi.lat))
+                wpt.set('lon', str(poi.lon))
+
+                # Add name
+                name_elem = SubElement(wpt, 'name')
+                name_elem.text = poi.name
+
+                # Add description
+                desc_elem = SubElement(wpt, 'desc')
+                desc_elem.text = poi.desc or ""
+
+                # Add elevation if available
+                if poi.ele is not None:
+                    ele_elem = SubElement(wpt, 'ele')
+                    ele_elem.text = str(poi.ele)
+
+                # Add link if available
+                if poi.link:
+                    link_elem = SubElement(wpt, 'link')
+                    link_elem.set('href', poi.link)
+
+                # Add original extensions if available
+                if poi.extensions:
+                    try:
+                        # Parse the extensions XML string and add it to the waypoint
+                        extensions_element = _extensions_element(poi.extensions)
+                        wpt.append(extensions_element)
+                    except ET.ParseError:
+                        # If parsing fails, skip the extensions to avoid corrupting the file
+                        pass
+
+    def write_garmin_optimized_gpx(self, file_path: Path, pois: Iterable[POI]):
         """Write GPX file optimized for Garmin devices"""
         # Create root GPX element with Garmin extensions
-        root = ET.Element('gpx')
-        root.set('xmlns', 'http://www.topografix.com/GPX/1/1')
-        root.set('xmlns:gpxx', 'http://www.garmin.com/xmlschemas/GpxExtensions/v3')
-        root.set('xmlns:wptx1', 'http://www.garmin.com/xmlschemas/WaypointExtension/v1')
-        root.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        root.set('xsi:schemaLocation',
-                 'http://www.topografix.com/GPX/1/1 http://www.topografix.com/GPX/1/1/gpx.xsd '
-                 'http://www.garmin.com/xmlschemas/GpxExtensions/v3 http://www8.garmin.com/xmlschemas/GpxExtensionsv3.xsd')
+        root = _new_root('gpx',
+                         {'': 'http://www.topografix.com/GPX/1/1',
+                          'gpxx': 'http://www.garmin.com/xmlschemas/GpxExtensions/v3',
+                          'wptx1': _WPTX1_URI,
+                          'xsi': _XSI_URI},
+                         'http://www.topografix.com/GPX/1/1 http://www.topografix.com/GPX/1/1/gpx.xsd '
+                         'http://www.garmin.com/xmlschemas/GpxExtensions/v3 http://www8.garmin.com/xmlschemas/GpxExtensionsv3.xsd')
         root.set('version', '1.1')
         root.set('creator', 'poi-tool-garmin')
 
@@ -173,59 +497,58 @@ class GPXFileHandler:
         name_elem = ET.SubElement(metadata, 'name')
         name_elem.text = 'Garmin POI Collection'
 
-        # Add POIs with Garmin optimizations
-        for poi in pois:
-            wpt = ET.SubElement(root, 'wpt')
-            wpt.set('lat', str(poi.lat))
-            wpt.set('lon', str(poi.lon))
-
-            # Garmin name optimization (20 char limit)
-            garmin_name = poi.name[:20] if len(poi.name) > 20 else poi.name
-            name_elem = ET.SubElement(wpt, 'name')
-            name_elem.text = garmin_name
-
-            # Add description
-            desc_elem = ET.SubElement(wpt, 'desc')
-            desc_elem.text = poi.desc or ""
-
-            # Add elevation if available
-            if poi.ele is not None:
-                ele_elem = ET.SubElement(wpt, 'ele')
-                ele_elem.text = str(poi.ele)
-
-            # Add Garmin waypoint symbol
-            sym_elem = ET.SubElement(wpt, 'sym')
-            sym_elem.text = 'Flag, Blue'
-
-            # Handle extensions - merge original with Garmin extensions
-            extensions = ET.SubElement(wpt, 'extensions')
-
-            # Add original extensions first if they exist
-            if poi.extensions:
-                try:
-                    original_extensions = ET.fromstring(poi.extensions)
-                    # Copy all child elements from original extensions
-                    for child in original_extensions:
-                        extensions.append(child)
-                except ET.ParseError:
-                    # If parsing fails, continue with just Garmin extensions
-                    pass
-
-            # Add Garmin extensions
-            wptx1_ext = ET.SubElement(extensions, 'wptx1:WaypointExtension')
-
-            # Add proximity alarm (100 meters)
-            proximity = ET.SubElement(wptx1_ext, 'wptx1:Proximity')
-            proximity.text = '100'
-
-            # Add display mode
-            display_mode = ET.SubElement(wptx1_ext, 'wptx1:DisplayMode')
-            display_mode.text = 'SymbolAndName'
-
-        # Write to file
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space="  ", level=0)
-        tree.write(file_path, encoding='utf-8', xml_declaration=True)
+        # Stream POIs with Garmin optimizations; names are resolved once up front
+        SubElement = ET.SubElement
+        wptx1_proximity_tag = _wptx1('Proximity')
+        wptx1_display_mode_tag = _wptx1('DisplayMode')
+        with _xml_stream(file_path) as xml_out, xml_out.element(root):
+            for poi in pois:
+                wpt = xml_out.subelement('wpt')
+                wpt.set('lat', str(poi.lat))
+                wpt.set('lon', str(poi.lon))
+
+                # Garmin name optimization (20 char limit)
+                garmin_name = poi.name[:20] if len(poi.name) > 20 else poi.name
+                name_elem = SubElement(wpt, 'name')
+                name_elem.text = garmin_name
+
+                # Add description
+                desc_elem = SubElement(wpt, 'desc')
+                desc_elem.text = poi.desc or ""
+
+                # Add elevation if available
+                if poi.ele is not None:
+                    ele_elem = SubElement(wpt, 'ele')
+                    ele_elem.text = str(poi.ele)
+
+                # Add Garmin waypoint symbol
+                sym_elem = SubElement(wpt, 'sym')
+                sym_elem.text = 'Flag, Blue'
+
+                # Handle extensions - merge original with Garmin extensions
+                extensions = SubElement(wpt, 'extensions')
+
+                # Add original extensions first if they exist
+                if poi.extensions:
+                    try:
+                        original_extensions = _extensions_element(poi.extensions)
+                        # Copy all child elements from original extensions
+                        for child in original_extensions:
+                            extensions.append(child)
+                    except ET.ParseError:
+                        # If parsing fails, continue with just Garmin extensions
+                        pass
+
+                # Add Garmin extensions
+                wptx1_ext = _add_waypoint_extension(extensions)
+
+                # Add proximity alarm (100 meters)
+                proximity = SubElement(wptx1_ext, wptx1_proximity_tag)
+                proximity.text = '100'
+
+                # Add display mode
+                display_mode = SubElement(wptx1_ext, wptx1_display_mode_tag)
+                display_mode.text = 'SymbolAndName'
 
 
 class FITFileHandler:
@@ -277,6 +600,19 @@ class FITFileHandler:
             return []
 
 
+def read_poi_file(file_path: Path) -> List[POI]:
+    """
+    Read POIs from a GPX or FIT file, picking the handler by suffix.
+    A plain module-level function, so read_many can send it to worker
+    processes without pickling any handler or manager state. There is no
+    exists() check: callers pass paths they have already listed or
+    stat'ed, and a file that has vanished since is reported as a read error.
+    """
+    if file_path.suffix.lower() == '.fit':
+        return FITFileHandler().read_fit_file(file_path)
+    return GPXFileHandler().read_gpx_file(file_path)
+
+
 class ExportHandler:
     """Handles exporting POIs to various formats."""
 
@@ -291,94 +627,91 @@ class ExportHandler:
     @staticmethod
     def _export_garmin_poi_csv(pois: List[POI], output_path: Path, verbose: bool = False):
         """Export POIs to Garmin POI CSV format"""
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
             writer = csv.writer(csvfile)
 
             # Garmin POI CSV format: longitude,latitude,name
-            for poi in pois:
-                # Garmin expects longitude first, then latitude
-                writer.writerow([poi.lon, poi.lat, poi.name])
+            # (Garmin expects longitude first, then latitude)
+            writer.writerows((poi.lon, poi.lat, poi.name) for poi in pois)
 
-                if verbose:
-                    print(f"Exported: {poi.name} ({poi.lat:.6f}, {poi.lon:.6f})")
+        if verbose:
+            for poi in pois:
+                print(f"Exported: {poi.name} ({poi.lat:.6f}, {poi.lon:.6f})")
 
     @staticmethod
     def _export_standard_csv(pois: List[POI], output_path: Path, verbose: bool = False):
         """Export POIs to standard CSV format"""
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
             writer = csv.writer(csvfile)
 
             # Write header
             writer.writerow(['name', 'latitude', 'longitude', 'elevation', 'description', 'link'])
 
             # Write POI data
+            writer.writerows(
+                (poi.name, poi.lat, poi.lon, poi.ele or '', poi.desc, poi.link or '')
+                for poi in pois
+            )
+
+        if verbose:
             for poi in pois:
-                writer.writerow([
-                    poi.name,
-                    poi.lat,
-                    poi.lon,
-                    poi.ele or '',
-                    poi.desc,
-                    poi.link or ''
-                ])
-
-                if verbose:
-                    print(f"Exported: {poi.name} ({poi.lat:.6f}, {poi.lon:.6f})")
+                print(f"Exported: {poi.name} ({poi.lat:.6f}, {poi.lon:.6f})")
 
     @staticmethod
     def export_to_kml(pois: List[POI], output_path: Path, verbose: bool = False):
         """Export POIs to KML format for Google Earth"""
         # Create KML root
-        kml = ET.Element('kml')
-        kml.set('xmlns', 'http://www.opengis.net/kml/2.2')
+        kml = _new_root('kml', {'': 'http://www.opengis.net/kml/2.2'})
 
-        # Create document
-        document = ET.SubElement(kml, 'Document')
+        # Create document (written inside the root, not attached to it)
+        document = ET.Element('Document')
         name_elem = ET.SubElement(document, 'name')
         name_elem.text = 'POI Collection'
 
         # Add styles for different POI types
         ExportHandler._add_kml_styles(document)
 
-        # Group POIs by type for better organization
-        poi_groups = ExportHandler._group_pois_by_type(pois)
+        # Group POIs by type for better organization; each POI is classified
+        # once and its folder's type also selects its style
+        poi_buckets = ExportHandler._bucket_pois_by_type(pois)
 
-        for group_name, group_pois in poi_groups.items():
-            # Create folder for this group
-            folder = ET.SubElement(document, 'Folder')
-            folder_name = ET.SubElement(folder, 'name')
-            folder_name.text = group_name
+        # Stream folders and their placemarks to the file one at a time
+        SubElement = ET.SubElement
+        with _xml_stream(output_path) as xml_out, xml_out.element(kml), xml_out.element(document):
+            for poi_type, group_pois in poi_buckets.items():
+                group_name = _POI_TYPE_GROUPS[poi_type]
+                style = f"#{poi_type}-style"
 
-            for poi in group_pois:
-                placemark = ET.SubElement(folder, 'Placemark')
+                # Create folder for this group
+                folder = ET.Element('Folder')
+                folder_name = ET.SubElement(folder, 'name')
+                folder_name.text = group_name
 
-                # Name
-                name_elem = ET.SubElement(placemark, 'name')
-                name_elem.text = poi.name
+                with xml_out.element(folder):
+                    for poi in group_pois:
+                        placemark = xml_out.subelement('Placemark')
 
-                # Description
-                if poi.desc:
-                    desc_elem = ET.SubElement(placemark, 'description')
-                    desc_elem.text = poi.desc
+                        # Name
+                        name_elem = SubElement(placemark, 'name')
+                        name_elem.text = poi.name
 
-                # Style
-                style_url = ET.SubElement(placemark, 'styleUrl')
-                poi_type = ExportHandler._determine_poi_type(poi.name.lower())
-                style_url.text = f"#{poi_type}-style"
+                        # Description
+                        if poi.desc:
+                            desc_elem = SubElement(placemark, 'description')
+                            desc_elem.text = poi.desc
 
-                # Point
-                point = ET.SubElement(placemark, 'Point')
-                coordinates = ET.SubElement(point, 'coordinates')
-                ele_str = f",{poi.ele}" if poi.ele is not None else ""
-                coordinates.text = f"{poi.lon},{poi.lat}{ele_str}"
+                        # Style
+                        style_url = SubElement(placemark, 'styleUrl')
+                        style_url.text = style
 
-                if verbose:
-                    print(f"Added to KML: {poi.name} ({group_name})")
+                        # Point
+                        point = SubElement(placemark, 'Point')
+                        coordinates = SubElement(point, 'coordinates')
+                        ele_str = f",{poi.ele}" if poi.ele is not None else ""
+                        coordinates.text = f"{poi.lon},{poi.lat}{ele_str}"
 
-        # Write KML file
-        tree = ET.ElementTree(kml)
-        ET.indent(tree, space="  ", level=0)
-        tree.write(output_path, encoding='utf-8', xml_declaration=True)
+                        if verbose:
+                            print(f"Added to KML: {poi.name} ({group_name})")
 
     @staticmethod
     def _add_kml_styles(document: ET.Element):
@@ -405,36 +738,24 @@ class ExportHandler:
     @staticmethod
     def _group_pois_by_type(pois: List[POI]) -> Dict[str, List[POI]]:
         """Group POIs by type based on name analysis"""
-        groups = {
-            'Mountain Huts & Cabins': [],
-            'Peaks & Summits': [],
-            'Lakes & Water': [],
-            'Other Locations': []
-        }
+        return {_POI_TYPE_GROUPS[poi_type]: group_pois
+                for poi_type, group_pois in ExportHandler._bucket_pois_by_type(pois).items()}
 
+    @staticmethod
+    def _bucket_pois_by_type(pois: List[POI]) -> Dict[str, List[POI]]:
+        """Classify each POI once into non-empty buckets keyed by POI type, in folder order"""
+        buckets: Dict[str, List[POI]] = {poi_type: [] for poi_type in _POI_TYPE_GROUPS}
+        determine_poi_type = ExportHandler._determine_poi_type
         for poi in pois:
-            name_lower = poi.name.lower()
-
-            if any(word in name_lower for word in ['hytte', 'cabin', 'hut', 'turisthytte', 'koie']):
-                groups['Mountain Huts & Cabins'].append(poi)
-            elif any(word in name_lower for word in ['topp', 'peak', 'summit', 'fjell', 'berg']):
-                groups['Peaks & Summits'].append(poi)
-            elif any(word in name_lower for word in ['vatn', 'lake', 'tjern', 'sjø']):
-                groups['Lakes & Water'].append(poi)
-            else:
-                groups['Other Locations'].append(poi)
+            buckets[determine_poi_type(poi.name.lower())].append(poi)
 
         # Remove empty groups
-        return {name: pois for name, pois in groups.items() if pois}
+        return {poi_type: group_pois for poi_type, group_pois in buckets.items() if group_pois}
 
     @staticmethod
     def _determine_poi_type(name_lower: str) -> str:
         """Determine POI type from name for styling"""
-        if any(word in name_lower for word in ['hytte', 'cabin', 'hut', 'turisthytte', 'koie']):
-            return 'cabin'
-        elif any(word in name_lower for word in ['topp', 'peak', 'summit', 'fjell', 'berg']):
-            return 'peak'
-        elif any(word in name_lower for word in ['vatn', 'lake', 'tjern', 'sjø']):
-            return 'lake'
-        else:
-            return 'default'
+        for poi_type, keywords_re in _POI_TYPE_PATTERNS:
+            if keywords_re.search(name_lower):
+                return poi_type
+        return 'default'
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compiled numeric kernels for POI distance calculations.
+
+The kernels operate on float64 coordinate arrays in radians and are
+JIT-compiled with Numba when it is installed. Callers should check
+NUMBA_SUPPORT and use the NumPy or pure-Python paths otherwise, since the
+uncompiled functions are plain Python loops.
+"""
+
+import math
+
+# Optional Numba support for compiled distance kernels
+try:
+    from numba import njit
+    NUMBA_SUPPORT = True
+except ImportError:
+    NUMBA_SUPPORT = False
+
+
+def _jit(func):
+    """Compile func with Numba if available, otherwise return it unchanged."""
+    if NUMBA_SUPPORT:
+        return njit(cache=True, fastmath=True, nogil=True)(func)
+    return func
+
+
+@_jit
+def haversine_block(lat0, lon0, lats, lons, indices, radius, out):
+    """Write Haversine distances from (lat0, lon0) to lats/lons[indices] into out."""
+    cos_lat0 = math.cos(lat0)
+    for k in range(indices.shape[0]):
+        i = indices[k]
+        dlat = lats[i] - lat0
+        dlon = lons[i] - lon0
+        a = math.sin(dlat / 2) ** 2 + cos_lat0 * math.cos(lats[i]) * math.sin(dlon / 2) ** 2
+        out[k] = 2 * radius * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+@_jit
+def equirectangular_block(lat0, lon0, lats, lons, indices, radius, out):
+    """Write equirectangular distances from (lat0, lon0) to lats/lons[indices] into out."""
+    cos_lat0 = math.cos(lat0)
+    for k in range(indices.shape[0]):
+        i = indices[k]
+        dlon = lons[i] - lon0
+        if dlon > math.pi:
+            dlon -= 2 * math.pi
+        elif dlon < -math.pi:
+            dlon += 2 * math.pi
+        x = dlon * (cos_lat0 + math.cos(lats[i])) * 0.5
+        y = lats[i] - lat0
+        out[k] = radius * math.sqrt(x * x + y * y)
+
+
+@_jit
+def nearest_duplicate(lat0, lon0, lats, lons, indices, radius, threshold, short):
+    """Return the entry of indices nearest to (lat0, lon0) within threshold, or -1.
+
+    Uses the equirectangular distance when short is set and Haversine
+    otherwise, matching the block kernels. Ties keep the earliest entry.
+    """
+    cos_lat0 = math.cos(lat0)
+    best = -1
+    best_distance = math.inf
+    for k in range(indices.shape[0]):
+        i = indices[k]
+        if short:
+            dlon = lons[i] - lon0
+            if dlon > math.pi:
+                dlon -= 2 * math.pi
+            elif dlon < -math.pi:
+                dlon += 2 * math.pi
+            x = dlon * (cos_lat0 + math.cos(lats[i])) * 0.5
+            y = lats[i] - lat0
+            distance = radius * math.sqrt(x * x + y * y)
+        else:
+            dlat = lats[i] - lat0
+            dlon = lons[i] - lon0
+            a = math.sin(dlat / 2) ** 2 + cos_lat0 * math.cos(lats[i]) * math.sin(dlon / 2) ** 2
+            distance = 2 * radius * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        if distance <= threshold and distance < best_distance:
+            best = i
+            best_distance = distance
+    return best
@@ -6,17 +6,79 @@ This module contains the GPXManager class with optimized algorithms
 for POI deduplication, merging, and enhancement operations.
 """
 
+import itertools
 import json
 import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
-
-from poi_core import POI, SpatialGrid
-from poi_formats import FITFileHandler, GPXFileHandler
+from requests.adapters import HTTPAdapter
+
+# Optional orjson support for faster encoding/decoding of elevation requests
+try:
+    import orjson
+    ORJSON_SUPPORT = True
+except ImportError:
+    ORJSON_SUPPORT = False
+
+from poi_core import POI, LatitudeIndex, SpatialGrid, haversine_term_limit
+from poi_formats import FITFileHandler, GPXFileHandler, read_poi_file
+
+ELEVATION_API_URL = "https://api.open-elevation.com/api/v1/lookup"
+ELEVATION_BATCH_SIZE = 50
+# Batches in flight at once; the pacer below still spaces out their requests
+ELEVATION_WORKERS = 4
+# Minimum seconds between the starts of two elevation requests
+ELEVATION_REQUEST_INTERVAL = 0.1
+
+# Threads writing split_to_individual_files output, and how many writes may
+# be queued before the reader waits for the oldest
+SPLIT_WRITE_WORKERS = 8
+SPLIT_MAX_PENDING = 64
+
+# Characters garmin_optimize drops from names, plus a translate() table that
+# deletes the ASCII ones without running the regex
+_GARMIN_NAME_STRIP = re.compile(r'[^\w\s-]')
+_GARMIN_ASCII_DELETE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if _GARMIN_NAME_STRIP.match(c)))
+
+# One pass for _sanitize_filename: each unsafe character (which covers the
+# Windows forbidden <>:"/\|?*) becomes '_', and so does each run of spaces.
+# Alphanumerics, '-', '_' and Norwegian letters are kept
+_FILENAME_UNSAFE = re.compile(r'[^\w\s\-_åæøÅÆØ]|\s+')
+
+
+class _RequestPacer:
+    """
+    Spaces out requests made from several threads. A back-off (e.g. after
+    HTTP 429) delays every thread, not just the one that was rate limited.
+    """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        """Block until this thread may start its next request."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+    def back_off(self, seconds: float):
+        """Hold all requests for at least the given number of seconds."""
+        with self._lock:
+            self._next_start = max(self._next_start, time.monotonic() + seconds)
 
 
 class GPXManager:
@@ -26,6 +88,33 @@ class GPXManager:
         self.gpx_handler = GPXFileHandler()
         self.fit_handler = FITFileHandler()
         self.duplicate_threshold = 100.0  # meters
+        # Created by lookup_elevations on first use
+        self._elevation_session: Optional[requests.Session] = None
+        self._elevation_pacer: Optional[_RequestPacer] = None
+
+    def __getstate__(self):
+        """Pickle without the elevation session and pacer (they hold locks)"""
+        state = self.__dict__.copy()
+        state['_elevation_session'] = None
+        state['_elevation_pacer'] = None
+        return state
+
+    @property
+    def duplicate_threshold(self) -> float:
+        """Distance in meters within which two POIs are considered duplicates"""
+        return self._duplicate_threshold
+
+    @duplicate_threshold.setter
+    def duplicate_threshold(self, meters: float):
+        self._duplicate_threshold = meters
+        # Derived once here so duplicate checks can compare without a sqrt
+        # (or, for long thresholds, without atan2)
+        self.thresh_sq = meters * meters
+        self.haversine_limit = haversine_term_limit(meters)
+
+    def _is_duplicate(self, poi: POI, other: POI) -> bool:
+        """Duplicate check using the configured threshold"""
+        return poi.is_duplicate(other, self._duplicate_threshold, self.thresh_sq, self.haversine_limit)
 
     def read_gpx_file(self, file_path: Path) -> List[POI]:
         """Read POIs from a GPX or FIT file"""
@@ -39,14 +128,66 @@ class GPXManager:
         else:
             return self.gpx_handler.read_gpx_file(file_path)
 
-    def write_gpx_file(self, file_path: Path, pois: List[POI]):
-        """Write POIs to a GPX file"""
+    def read_gpx_file_iter(self, file_path: Path) -> Iterator[POI]:
+        """Like read_gpx_file, but GPX waypoints are yielded as they are parsed"""
+        if not file_path.exists():
+            print(f"File not found: {file_path}")
+            return iter(())
+
+        if file_path.suffix.lower() == '.fit':
+            return iter(self.fit_handler.read_fit_file(file_path))
+        return self.gpx_handler.read_gpx_file_iter(file_path)
+
+    def read_many(self, file_paths: List[Path]) -> List[List[POI]]:
+        """Read several GPX or FIT files in parallel, one POI list per file"""
+        return self.gpx_handler.read_many(file_paths, reader=read_poi_file)
+
+    def write_gpx_file(self, file_path: Path, pois: Iterable[POI]):
+        """Write POIs to a GPX file (any iterable, read once)"""
         self.gpx_handler.write_gpx_file(file_path, pois)
 
-    def write_garmin_optimized_gpx(self, file_path: Path, pois: List[POI]):
-        """Write GPX file optimized for Garmin devices"""
+    def write_garmin_optimized_gpx(self, file_path: Path, pois: Iterable[POI]):
+        """Write GPX file optimized for Garmin devices (any iterable, read once)"""
         self.gpx_handler.write_garmin_optimized_gpx(file_path, pois)
 
+    @staticmethod
+    def _merge_into(result_pois: List[POI], merged_indices: Set[int], index: int, poi: POI):
+        """Merge poi into result_pois[index].
+
+        The first merge creates a new POI so the caller's objects are never
+        modified; later merges into the same slot update that copy in place.
+        """
+        if index in merged_indices:
+            result_pois[index].merge_inplace(poi)
+        else:
+            result_pois[index] = result_pois[index].merge_with(poi)
+            merged_indices.add(index)
+
+    def _find_duplicate(self, grid: SpatialGrid, exact_positions: Dict[Tuple[float, float], int],
+                        result_pois: List[POI], merged_indices: Set[int], poi: POI) -> int:
+        """Index of the nearest indexed POI that poi duplicates, or -1.
+
+        The grid measures the coordinates each POI had when it was indexed,
+        which are still current unless that slot has been merged into since.
+        exact_positions maps indexed coordinates to the first slot indexed
+        there, so re-exported copies are matched without a grid query.
+        """
+        # An exact hit is what the grid would return as nearest (distance 0)
+        nearest = exact_positions.get((poi.lat, poi.lon))
+        threshold = self._duplicate_threshold
+        if nearest is None:
+            nearest = grid.find_nearest_poi(poi, threshold)
+        if (nearest < 0 or nearest not in merged_indices
+                or self._is_duplicate(poi, result_pois[nearest])):
+            return nearest
+
+        # The nearest slot moved away when it was merged; try the rest in order
+        for nearby_index, distance in grid.find_nearby_pois(poi, threshold):
+            if (nearby_index not in merged_indices
+                    or self._is_duplicate(poi, result_pois[nearby_index])):
+                return nearby_index
+        return -1
+
     def merge_pois(self, target_pois: List[POI], source_pois: List[POI]) -> List[POI]:
         """
         Optimized merge using spatial indexing - O(n+m) vs O(n*m) performance.
@@ -64,18 +205,24 @@ class GPXManager:
         return self._merge_pois_original(target_pois, source_pois)
 
     def _merge_pois_original(self, target_pois: List[POI], source_pois: List[POI]) -> List[POI]:
-        """Original O(n*m) merge algorithm for small datasets."""
+        """Merge for small datasets; first match wins, latitude sweep prunes candidates."""
         result_pois = target_pois.copy()
+        lat_index = LatitudeIndex(result_pois)
+        merged_indices: Set[int] = set()
 
         for source_poi in source_pois:
             duplicate_found = False
-            for i, target_poi in enumerate(result_pois):
-                if source_poi.is_duplicate(target_poi):
-                    result_pois[i] = target_poi.merge_with(source_poi)
+            for i in lat_index.find_candidates(source_poi, self.duplicate_threshold):
+                target_poi = result_pois[i]
+                if self._is_duplicate(source_poi, target_poi):
+                    old_lat = target_poi.lat
+                    self._merge_into(result_pois, merged_indices, i, source_poi)
+                    lat_index.move_poi(i, old_lat, result_pois[i].lat)
                     duplicate_found = True
                     break
 
             if not duplicate_found:
+                lat_index.add_poi(source_poi, len(result_pois))
                 result_pois.append(source_poi)
 
         return result_pois
@@ -85,28 +232,25 @@ class GPXManager:
         # Create spatial index with target POIs
         grid = SpatialGrid(cell_size_meters=self.duplicate_threshold * 3)
         result_pois = target_pois.copy()
+        merged_indices: Set[int] = set()
+        exact_positions: Dict[Tuple[float, float], int] = {}
 
-        # Index all target POIs
+        # Index all target POIs in one pass
+        grid.bulk_load(result_pois)
         for i, poi in enumerate(result_pois):
-            grid.add_poi(poi, i)
+            exact_positions.setdefault((poi.lat, poi.lon), i)
 
         # Process source POIs
         for source_poi in source_pois:
-            nearby = grid.find_nearby_pois(source_poi, self.duplicate_threshold)
-
-            duplicate_found = False
-            for nearby_index, distance in nearby:
-                if nearby_index < len(result_pois):
-                    target_poi = result_pois[nearby_index]
-                    if source_poi.is_duplicate(target_poi):
-                        result_pois[nearby_index] = target_poi.merge_with(source_poi)
-                        duplicate_found = True
-                        break
-
-            if not duplicate_found:
+            nearby_index = self._find_duplicate(grid, exact_positions, result_pois,
+                                                merged_indices, source_poi)
+            if nearby_index >= 0:
+                self._merge_into(result_pois, merged_indices, nearby_index, source_poi)
+            else:
                 new_index = len(result_pois)
                 result_pois.append(source_poi)
                 grid.add_poi(source_poi, new_index)
+                exact_positions.setdefault((source_poi.lat, source_poi.lon), new_index)
 
         return result_pois
 
@@ -127,18 +271,24 @@ class GPXManager:
         return self._deduplicate_pois_original(pois)
 
     def _deduplicate_pois_original(self, pois: List[POI]) -> List[POI]:
-        """Original O(n²) deduplication algorithm for small datasets."""
+        """Deduplication for small datasets; first match wins, latitude sweep prunes candidates."""
         result_pois = [pois[0]]
+        lat_index = LatitudeIndex(result_pois)
+        merged_indices: Set[int] = set()
 
         for poi in pois[1:]:
             duplicate_found = False
-            for i, result_poi in enumerate(result_pois):
-                if poi.is_duplicate(result_poi):
-                    result_pois[i] = result_poi.merge_with(poi)
+            for i in lat_index.find_candidates(poi, self.duplicate_threshold):
+                result_poi = result_pois[i]
+                if self._is_duplicate(poi, result_poi):
+                    old_lat = result_poi.lat
+                    self._merge_into(result_pois, merged_indices, i, poi)
+                    lat_index.move_poi(i, old_lat, result_pois[i].lat)
                     duplicate_found = True
                     break
 
             if not duplicate_found:
+                lat_index.add_poi(poi, len(result_pois))
                 result_pois.append(poi)
 
         return result_pois
@@ -147,39 +297,30 @@ class GPXManager:
         """Optimized deduplication using spatial grid - O(n) average case."""
         grid = SpatialGrid(cell_size_meters=self.duplicate_threshold * 3)
         result_pois = []
-        processed_indices: Set[int] = set()
-
-        for i, poi in enumerate(pois):
-            if i in processed_indices:
-                continue
-
-            # Find nearby POIs that might be duplicates
-            nearby = grid.find_nearby_pois(poi, self.duplicate_threshold)
+        merged_indices: Set[int] = set()
+        exact_positions: Dict[Tuple[float, float], int] = {}
 
+        for poi in pois:
             # Check if any nearby POI is a duplicate in our results
-            duplicate_found = False
-            for nearby_index, distance in nearby:
-                if nearby_index < len(result_pois):
-                    result_poi = result_pois[nearby_index]
-                    if poi.is_duplicate(result_poi):
-                        result_pois[nearby_index] = result_poi.merge_with(poi)
-                        duplicate_found = True
-                        processed_indices.add(i)
-                        break
-
-            if not duplicate_found:
+            nearby_index = self._find_duplicate(grid, exact_positions, result_pois,
+                                                merged_indices, poi)
+            if nearby_index >= 0:
+                self._merge_into(result_pois, merged_indices, nearby_index, poi)
+            else:
                 # Add new unique POI
                 result_index = len(result_pois)
                 result_pois.append(poi)
                 grid.add_poi(poi, result_index)
-                processed_indices.add(i)
+                exact_positions.setdefault((poi.lat, poi.lon), result_index)
 
         return result_pois
 
     def garmin_optimize(self, pois: List[POI]) -> List[POI]:
         """Optimize POI data for Garmin devices"""
-        optimized_pois = []
+        return list(self.garmin_optimize_iter(pois))
 
+    def garmin_optimize_iter(self, pois: Iterable[POI]) -> Iterator[POI]:
+        """Like garmin_optimize, but optimized POIs are yielded one at a time"""
         for poi in pois:
             # Create optimized copy
             optimized_name = poi.name
@@ -189,10 +330,13 @@ class GPXManager:
                 optimized_name = optimized_name[:20]
 
             # Clean up name for better display
-            optimized_name = re.sub(r'[^\w\s-]', '', optimized_name)
+            if optimized_name.isascii():
+                optimized_name = optimized_name.translate(_GARMIN_ASCII_DELETE)
+            else:
+                optimized_name = _GARMIN_NAME_STRIP.sub('', optimized_name)
             optimized_name = optimized_name.strip()
 
-            optimized_poi = POI(
+            yield POI(
                 lat=poi.lat,
                 lon=poi.lon,
                 name=optimized_name,
@@ -201,19 +345,13 @@ class GPXManager:
                 link=poi.link
             )
 
-            optimized_pois.append(optimized_poi)
-
-        return optimized_pois
-
     def add_waypoint_symbols(self, pois: List[POI]) -> List[POI]:
-        """Add Garmin waypoint symbols based on POI names"""
-        result_pois = []
-
-        for poi in pois:
-            # Copy POI (no actual symbol field in POI class, this is for GPX export)
-            result_pois.append(poi)
+        """Add Garmin waypoint symbols based on POI names.
 
-        return result_pois
+        POI has no symbol field (symbols are chosen at GPX export), so the
+        input list is returned as is rather than copied.
+        """
+        return pois
 
     def lookup_elevations(self, pois: List[POI], verbose: bool = False) -> List[POI]:
         """Look up elevation data for POIs using online service with robust error handling"""
@@ -223,8 +361,10 @@ class GPXManager:
         # First, clean any existing POIs with zero elevation (invalid data)
         cleaned_pois = self._remove_zero_elevations(pois, verbose)
 
-        # Filter POIs that need elevation data (None or removed zeros)
-        pois_needing_elevation = [poi for poi in cleaned_pois if poi.ele is None]
+        # Filter POIs that need elevation data (None or removed zeros),
+        # remembering where each one sits in the full list
+        needing_indices = [j for j, poi in enumerate(cleaned_pois) if poi.ele is None]
+        pois_needing_elevation = [cleaned_pois[j] for j in needing_indices]
 
         if not pois_needing_elevation:
             if verbose:
@@ -234,57 +374,72 @@ class GPXManager:
         if verbose:
             print(f"Found {len(pois_needing_elevation)} POIs without elevation data")
 
-        # Process in batches to avoid overwhelming the API
-        batch_size = 50
+        # Process in batches to avoid overwhelming the API; a few batches are
+        # in flight at once so network latency overlaps
+        batch_size = ELEVATION_BATCH_SIZE
         total_batches = (len(pois_needing_elevation) + batch_size - 1) // batch_size
-        updated_pois = cleaned_pois.copy()
+        # _remove_zero_elevations returned a fresh list, so results are
+        # written into it directly
+        updated_pois = cleaned_pois
 
         # Track success/failure statistics
         successful_elevations = 0
         failed_batches = 0
         total_processed = 0
 
-        for i in range(0, len(pois_needing_elevation), batch_size):
-            batch = pois_needing_elevation[i:i+batch_size]
-            batch_num = i // batch_size + 1
+        if self._elevation_session is None:
+            # One session and pacer shared by all workers keeps connections
+            # alive and the request rate bounded
+            self._elevation_session = requests.Session()
+            self._elevation_session.headers['User-Agent'] = 'GPX-POI-Tool/1.0'
+            # Room for one pooled connection per worker; retries stay in
+            # _lookup_elevation_batch, which reports and paces them
+            self._elevation_session.mount(
+                'https://', HTTPAdapter(pool_connections=1, pool_maxsize=ELEVATION_WORKERS))
+            self._elevation_pacer = _RequestPacer(ELEVATION_REQUEST_INTERVAL)
+
+        with ThreadPoolExecutor(max_workers=min(ELEVATION_WORKERS, total_batches)) as executor:
+            futures = {
+                executor.submit(self._lookup_elevation_batch,
+                                pois_needing_elevation[i:i+batch_size], verbose): i
+                for i in range(0, len(pois_needing_elevation), batch_size)
+            }
+
+            for future in as_completed(futures):
+                i = futures[future]
+                batch = pois_needing_elevation[i:i+batch_size]
+                batch_num = i // batch_size + 1
+                batch_updated, messages = future.result()
 
-            if verbose:
-                print(f"Processing batch {batch_num}/{total_batches} ({len(batch)} POIs)...")
+                if verbose:
+                    for message in messages:
+                        print(message)
+                    print(f"Finished batch {batch_num}/{total_batches} ({len(batch)} POIs)")
 
-            # Count POIs in batch that had elevation before processing
-            before_count = sum(1 for poi in batch if poi.ele is not None and poi.ele > 0)
+                # Count POIs in batch that had elevation before processing
+                before_count = sum(1 for poi in batch if poi.ele is not None and poi.ele > 0)
 
-            # Update elevations for this batch
-            batch_updated = self._lookup_elevation_batch(batch, verbose)
+                # Count successful elevations in this batch
+                after_count = sum(1 for poi in batch_updated if poi.ele is not None and poi.ele > 0)
+                batch_success = after_count - before_count
 
-            # Count successful elevations in this batch
-            after_count = sum(1 for poi in batch_updated if poi.ele is not None and poi.ele > 0)
-            batch_success = after_count - before_count
+                if batch_success == 0 and len(batch) > 0:
+                    failed_batches += 1
+                    if verbose:
+                        print(f"  Warning: No elevations retrieved for batch {batch_num}")
+                elif verbose and batch_success < len(batch):
+                    print(f"  Partial success: {batch_success}/{len(batch)} elevations retrieved")
 
-            if batch_success == 0 and len(batch) > 0:
-                failed_batches += 1
-                if verbose:
-                    print(f"  Warning: No elevations retrieved for batch {batch_num}")
-            elif verbose and batch_success < len(batch):
-                print(f"  Partial success: {batch_success}/{len(batch)} elevations retrieved")
-
-            successful_elevations += batch_success
-            total_processed += len(batch)
-
-            # Replace POIs in the main list
-            for updated_poi in batch_updated:
-                for j, original_poi in enumerate(updated_pois):
-                    if (updated_poi.lat == original_poi.lat and
-                        updated_poi.lon == original_poi.lon and
-                        updated_poi.name == original_poi.name):
-                        updated_pois[j] = updated_poi
-                        break
-
-            # Adaptive rate limiting - slower if we had failures
-            if batch_success < len(batch) // 2:  # Less than 50% success rate
-                time.sleep(0.5)  # Longer delay
-            else:
-                time.sleep(0.1)  # Normal delay
+                successful_elevations += batch_success
+                total_processed += len(batch)
+
+                # Replace POIs in the main list (batch results keep batch order)
+                for j, updated_poi in zip(needing_indices[i:i+batch_size], batch_updated):
+                    updated_pois[j] = updated_poi
+
+                # Adaptive rate limiting - slower if we had failures
+                if batch_success < len(batch) // 2:  # Less than 50% success rate
+                    self._elevation_pacer.back_off(0.5)
 
         # Final statistics
         if verbose:
@@ -304,42 +459,59 @@ class GPXManager:
 
         return updated_pois
 
-    def _lookup_elevation_batch(self, pois: List[POI], verbose: bool = False, max_retries: int = 3) -> List[POI]:
-        """Look up elevation for a batch of POIs with robust error handling and retries"""
+    def _lookup_elevation_batch(self, pois: List[POI], verbose: bool = False,
+                                max_retries: int = 3) -> Tuple[List[POI], List[str]]:
+        """
+        Look up elevation for a batch of POIs with robust error handling and retries.
+        Runs on a worker thread, so verbose messages are returned with the
+        POIs for the caller to print rather than printed here.
+        """
+        messages: List[str] = []
+        log = messages.append
         locations = [{"latitude": poi.lat, "longitude": poi.lon} for poi in pois]
 
+        # Serialize the request body once; it is reused across retries
+        if ORJSON_SUPPORT:
+            request_body = {'data': orjson.dumps({"locations": locations}),
+                            'headers': {'Content-Type': 'application/json'}}
+        else:
+            request_body = {'json': {"locations": locations}}
+
         # Calculate dynamic timeout based on batch size (minimum 30 seconds, +1 second per POI)
         timeout = max(30, 30 + len(pois))
 
         for attempt in range(max_retries):
             try:
                 if verbose and attempt > 0:
-                    print(f"  Retry attempt {attempt + 1}/{max_retries}...")
+                    log(f"  Retry attempt {attempt + 1}/{max_retries}...")
 
                 # Use Open-Elevation API (free service)
-                response = requests.post(
-                    "https://api.open-elevation.com/api/v1/lookup",
-                    json={"locations": locations},
+                self._elevation_pacer.wait()
+                response = self._elevation_session.post(
+                    ELEVATION_API_URL,
                     timeout=timeout,
-                    headers={'User-Agent': 'GPX-POI-Tool/1.0'}
+                    **request_body
                 )
 
                 if response.status_code == 200:
                     try:
-                        elevation_data = response.json()
-                    except ValueError as e:
+                        if ORJSON_SUPPORT:
+                            elevation_data = orjson.loads(response.content)
+                        else:
+                            elevation_data = response.json()
+                    except ValueError as e:  # Also covers orjson.JSONDecodeError
                         if verbose:
-                            print(f"  API returned invalid JSON: {e}")
+                            log(f"  API returned invalid JSON: {e}")
                         if attempt < max_retries - 1:
                             time.sleep(2 ** attempt)  # Exponential backoff
                             continue
-                        return pois
+                        return pois, messages
 
                     results = elevation_data.get('results', [])
 
                     if len(results) != len(pois):
                         if verbose:
-                            print(f"  Warning: API returned {len(results)} results for {len(pois)} POIs")
+                            log(f"  Warning: API returned {len(results)} results for {len(pois)} POIs")
 
                     updated_pois = []
                     successful_lookups = 0
@@ -362,118 +534,109 @@ class GPXManager:
                                 successful_lookups += 1
 
                                 if verbose:
-                                    print(f"  {poi.name}: {elevation}m")
+                                    log(f"  {poi.name}: {elevation}m")
                             else:
                                 # Keep original POI without elevation (don't add invalid 0.0)
                                 updated_pois.append(poi)
                                 if verbose and elevation == 0:
-                                    print(f"  {poi.name}: Skipped (elevation=0, likely invalid)")
+                                    log(f"  {poi.name}: Skipped (elevation=0, likely invalid)")
                         else:
                             # API returned fewer results than expected
                             updated_pois.append(poi)
                             if verbose:
-                                print(f"  {poi.name}: No elevation data returned")
+                                log(f"  {poi.name}: No elevation data returned")
 
                     if verbose and successful_lookups < len(pois):
-                        print(f"  Successfully retrieved elevation for {successful_lookups}/{len(pois)} POIs")
+                        log(f"  Successfully retrieved elevation for {successful_lookups}/{len(pois)} POIs")
 
-                    return updated_pois
+                    return updated_pois, messages
 
                 elif response.status_code == 429:  # Rate limited
                     if verbose:
-                        print(f"  Rate limited (HTTP 429), waiting before retry...")
+                        log(f"  Rate limited (HTTP 429), waiting before retry...")
                     if attempt < max_retries - 1:
-                        time.sleep(5 * (2 ** attempt))  # Longer backoff for rate limiting
+                        # Longer backoff for rate limiting, shared by all workers
+                        self._elevation_pacer.back_off(5 * (2 ** attempt))
                         continue
                     else:
                         if verbose:
-                            print(f"  Rate limiting persists after {max_retries} attempts")
-                        return pois
+                            log(f"  Rate limiting persists after {max_retries} attempts")
+                        return pois, messages
 
                 elif response.status_code >= 500:  # Server error
                     if verbose:
-                        print(f"  Server error (HTTP {response.status_code}), retrying...")
+                        log(f"  Server error (HTTP {response.status_code}), retrying...")
                     if attempt < max_retries - 1:
                         time.sleep(2 ** attempt)  # Exponential backoff
                         continue
                     else:
                         if verbose:
-                            print(f"  Server errors persist after {max_retries} attempts")
-                        return pois
+                            log(f"  Server errors persist after {max_retries} attempts")
+                        return pois, messages
 
                 else:  # Other HTTP errors (4xx)
                     if verbose:
-                        print(f"  API error (HTTP {response.status_code}): {response.text[:100]}")
-                    return pois  # Don't retry for client errors
+                        log(f"  API error (HTTP {response.status_code}): {response.text[:100]}")
+                    return pois, messages  # Don't retry for client errors
 
             except requests.exceptions.Timeout:
                 if verbose:
-                    print(f"  Request timeout after {timeout} seconds")
+                    log(f"  Request timeout after {timeout} seconds")
                 if attempt < max_retries - 1:
                     timeout = min(timeout * 1.5, 120)  # Increase timeout for retry, max 2 minutes
                     if verbose:
-                        print(f"  Increasing timeout to {timeout} seconds for retry")
+                        log(f"  Increasing timeout to {timeout} seconds for retry")
                     continue
                 else:
                     if verbose:
-                        print(f"  Timeout persists after {max_retries} attempts")
-                    return pois
+                        log(f"  Timeout persists after {max_retries} attempts")
+                    return pois, messages
 
             except requests.exceptions.ConnectionError:
                 if verbose:
-                    print(f"  Connection error - network unavailable")
+                    log(f"  Connection error - network unavailable")
                 if attempt < max_retries - 1:
                     time.sleep(5 * (2 ** attempt))  # Longer backoff for connection issues
                     continue
                 else:
                     if verbose:
-                        print(f"  Connection issues persist after {max_retries} attempts")
-                    return pois
+                        log(f"  Connection issues persist after {max_retries} attempts")
+                    return pois, messages
 
             except requests.exceptions.RequestException as e:
                 if verbose:
-                    print(f"  Network error: {e}")
+                    log(f"  Network error: {e}")
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)  # Exponential backoff
                     continue
                 else:
                     if verbose:
-                        print(f"  Network errors persist after {max_retries} attempts")
-                    return pois
+                        log(f"  Network errors persist after {max_retries} attempts")
+                    return pois, messages
 
             except Exception as e:
                 if verbose:
-                    print(f"  Unexpected error: {e}")
-                return pois  # Don't retry for unexpected errors
+                    log(f"  Unexpected error: {e}")
+                return pois, messages  # Don't retry for unexpected errors
 
         # Should not reach here, but just in case
-        return pois
+        return pois, messages
 
     def _remove_zero_elevations(self, pois: List[POI], verbose: bool = False) -> List[POI]:
         """Remove POIs with zero elevation (typically invalid data)"""
-        cleaned_pois = []
-        removed_count = 0
+        # Create new POIs without the invalid elevation
+        cleaned_pois = [
+            POI(lat=poi.lat, lon=poi.lon, name=poi.name, desc=poi.desc, ele=None, link=poi.link)
+            if poi.ele is not None and poi.ele == 0.0 else poi
+            for poi in pois
+        ]
 
-        for poi in pois:
-            if poi.ele is not None and poi.ele == 0.0:
-                removed_count += 1
-                # Create new POI without the invalid elevation
-                cleaned_poi = POI(
-                    lat=poi.lat,
-                    lon=poi.lon,
-                    name=poi.name,
-                    desc=poi.desc,
-                    ele=None,  # Remove the zero elevation
-                    link=poi.link
-                )
-                cleaned_pois.append(cleaned_poi)
-                if verbose:
-                    print(f"  Removed zero elevation from: {poi.name}")
-            else:
-                cleaned_pois.append(poi)
-
-        if verbose and removed_count > 0:
-            print(f"Cleaned {removed_count} POIs with invalid zero elevation")
+        if verbose:
+            zero_pois = [poi for poi in pois if poi.ele is not None and poi.ele == 0.0]
+            for poi in zero_pois:
+                print(f"  Removed zero elevation from: {poi.name}")
+            if zero_pois:
+                print(f"Cleaned {len(zero_pois)} POIs with invalid zero elevation")
 
         return cleaned_pois
 
@@ -499,10 +662,12 @@ class GPXManager:
         Returns:
             Number of individual files created
         """
-        # Read POIs from the source file
-        pois = self.read_gpx_file(gpx_file_path)
+        # Stream POIs from the source file; only those still waiting to be
+        # written are held in memory
+        pois = self.read_gpx_file_iter(gpx_file_path)
+        first_poi = next(pois, None)
 
-        if not pois:
+        if first_poi is None:
             if verbose:
                 print(f"No POIs found in {gpx_file_path}")
             return 0
@@ -515,46 +680,86 @@ class GPXManager:
         output_dir.mkdir(exist_ok=True)
 
         if verbose:
-            print(f"Splitting {len(pois)} POIs from {gpx_file_path}")
+            print(f"Splitting POIs from {gpx_file_path}")
             print(f"Output directory: {output_dir}")
 
         created_count = 0
         skipped_count = 0
 
-        for poi in pois:
-            # Sanitize POI name for filename
-            safe_name = self._sanitize_filename(poi.name)
-
-            if not safe_name:
-                skipped_count += 1
-                if verbose:
-                    print(f"  Skipped POI with empty/invalid name: '{poi.name}'")
-                continue
+        # Writes overlap on a thread pool (file creation latency dominates on
+        # USB and network drives). Results are collected in submission order,
+        # and at most SPLIT_MAX_PENDING writes are queued so POIs still stream
+        in_flight = deque()
+        # Last write submitted per file name, lowercased for case-insensitive
+        # filesystems; POIs sharing a file are written in input order so the
+        # last one still wins
+        last_write: Dict[str, Future] = {}
+
+        with ThreadPoolExecutor(max_workers=SPLIT_WRITE_WORKERS) as executor:
+            for poi in itertools.chain((first_poi,), pois):
+                # Sanitize POI name for filename
+                safe_name = self._sanitize_filename(poi.name)
+
+                if not safe_name:
+                    skipped_count += 1
+                    if verbose:
+                        print(f"  Skipped POI with empty/invalid name: '{poi.name}'")
+                    continue
 
-            # Create individual GPX file
-            output_file = output_dir / f"{safe_name}.gpx"
+                # Create individual GPX file
+                output_file = output_dir / f"{safe_name}.gpx"
+                file_key = safe_name.lower()
+                previous = last_write.get(file_key)
+                if previous is not None:
+                    wait((previous,))
 
-            try:
                 # Write single POI to new GPX file
-                self.write_gpx_file(output_file, [poi])
-                created_count += 1
+                future = executor.submit(self.write_gpx_file, output_file, [poi])
+                last_write[file_key] = future
+                in_flight.append((future, output_file, file_key))
 
-                if verbose:
-                    print(f"  Created: {output_file.name}")
+                while len(in_flight) >= SPLIT_MAX_PENDING or (in_flight and in_flight[0][0].done()):
+                    if self._finish_split_write(in_flight.popleft(), last_write, verbose):
+                        created_count += 1
+                    else:
+                        skipped_count += 1
 
-            except Exception as e:
-                if verbose:
-                    print(f"  Error creating {output_file.name}: {e}")
-                skipped_count += 1
+            while in_flight:
+                if self._finish_split_write(in_flight.popleft(), last_write, verbose):
+                    created_count += 1
+                else:
+                    skipped_count += 1
 
         if verbose:
             print(f"Split complete: {created_count} files created, {skipped_count} skipped")
 
         return created_count
 
-    def _sanitize_filename(self, name: str) -> str:
+    @staticmethod
+    def _finish_split_write(write: Tuple[Future, Path, str], last_write: Dict[str, Future],
+                            verbose: bool) -> bool:
+        """Wait for one split_to_individual_files write; True if the file was created."""
+        future, output_file, file_key = write
+        if last_write.get(file_key) is future:
+            del last_write[file_key]
+
+        try:
+            future.result()
+        except Exception as e:
+            if verbose:
+                print(f"  Error creating {output_file.name}: {e}")
+            return False
+
+        if verbose:
+            print(f"  Created: {output_file.name}")
+        return True
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _sanitize_filename(name: str) -> str:
         """
         Sanitize a POI name to be safe for use as a filename.
+        Cached, since exports often repeat names (e.g. re-exported series).
 
         Args:
             name: Original POI name
@@ -565,14 +770,8 @@ class GPXManager:
         if not name or not name.strip():
             return ""
 
-        # Remove or replace unsafe characters
-        import re
-
         # Replace common problematic characters
-        sanitized = name.strip()
-        sanitized = re.sub(r'[<>:"/\\|?*]', '_', sanitized)  # Windows forbidden chars
-        sanitized = re.sub(r'[^\w\s\-_åæøÅÆØ]', '_', sanitized)  # Keep alphanumeric, spaces, Norwegian chars
-        sanitized = re.sub(r'\s+', '_', sanitized)  # Replace spaces with underscores
+        sanitized = _FILENAME_UNSAFE.sub('_', name.strip())
         sanitized = sanitized.strip('_')  # Remove leading/trailing underscores
 
         # Limit length (many filesystems have 255 char limits)
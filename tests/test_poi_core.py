@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Tests for the spatial index in poi_core."""
+
+import random
+import unittest
+
+from poi_core import POI, SHORT_DISTANCE_METERS, SpatialGrid
+
+
+def _brute_force(pois, query, max_distance):
+    """Indices of pois within max_distance of query, by the metric SpatialGrid uses."""
+    if max_distance < SHORT_DISTANCE_METERS:
+        measure = query.distance_to_fast
+    else:
+        measure = query.distance_to
+    return sorted(i for i, poi in enumerate(pois) if measure(poi) <= max_distance)
+
+
+def _cluster(rng, lat, lon, spread, count):
+    """POIs scattered around (lat, lon), with longitudes wrapped into [-180, 180)."""
+    return [POI(lat=max(-90.0, min(90.0, lat + rng.uniform(-spread, spread))),
+                lon=(lon + rng.uniform(-spread, spread) + 180.0) % 360.0 - 180.0,
+                name=f'POI {i}')
+            for i in range(count)]
+
+
+class TestSpatialGrid(unittest.TestCase):
+    """The grid must find exactly the POIs a brute-force scan finds."""
+
+    def assert_matches_brute_force(self, pois, max_distance):
+        grid = SpatialGrid(cell_size_meters=300)
+        grid.bulk_load(pois)
+
+        for query in pois[::7]:
+            found = sorted(index for index, _ in grid.find_nearby_pois(query, max_distance))
+            self.assertEqual(found, _brute_force(pois, query, max_distance))
+
+    def test_mid_latitudes(self):
+        pois = _cluster(random.Random(1), 60.0, 10.0, 0.02, 400)
+        self.assert_matches_brute_force(pois, 100.0)
+        self.assert_matches_brute_force(pois, 2000.0)
+
+    def test_near_pole(self):
+        # Longitude cells shrink to nothing here, so the ring spans the band
+        pois = _cluster(random.Random(2), 89.995, 0.0, 0.01, 400)
+        self.assert_matches_brute_force(pois, 100.0)
+        self.assert_matches_brute_force(pois, 1500.0)
+
+    def test_points_added_between_wide_queries(self):
+        # Rows read by one wide query must still see cells filled after it
+        pois = _cluster(random.Random(4), 89.99, 0.0, 0.01, 300)
+        grid = SpatialGrid(cell_size_meters=300)
+        for i, poi in enumerate(pois):
+            found = sorted(index for index, _ in grid.find_nearby_pois(poi, 1500.0))
+            self.assertEqual(found, _brute_force(pois[:i], poi, 1500.0))
+            grid.add_poi(poi, i)
+
+    def test_points_on_the_radius(self):
+        # Neighbours due north of the query, just inside and just outside 1 km
+        query = POI(lat=45.0, lon=7.0, name='query')
+        step = 1000.0 / 6371000.0 * 180.0 / 3.141592653589793
+        pois = [query, POI(lat=45.0 + step * 0.999999, lon=7.0, name='inside'),
+                POI(lat=45.0 + step * 1.000001, lon=7.0, name='outside')]
+        grid = SpatialGrid(cell_size_meters=300)
+        for i, poi in enumerate(pois):
+            grid.add_poi(poi, i)
+        self.assertEqual([index for index, _ in grid.find_nearby_pois(query, 1000.0)], [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Tests for the GPX file handler."""
+
+import importlib.util
+import os
+import re
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from poi_core import POI
+import poi_formats
+from poi_formats import PARALLEL_READ_MIN_FILES, GPXFileHandler, read_poi_file
+
+# A Garmin-style waypoint file; its extensions use a namespace of their own
+GARMIN_GPX = '''<?xml version="1.0" encoding="UTF-8"?>
+<gpx xmlns="http://www.topografix.com/GPX/1/1" xmlns:gpxx="http://www.garmin.com/xmlschemas/GpxExtensions/v3" version="1.1">
+  <wpt lat="61.0" lon="9.0"><name>Hytte 1</name><extensions>
+    <gpxx:WaypointExtension><gpxx:DisplayMode>SymbolAndName</gpxx:DisplayMode></gpxx:WaypointExtension>
+  </extensions></wpt>
+  <wpt lat="61.1" lon="9.1"><name>Hytte 2</name><extensions>
+    <gpxx:WaypointExtension><gpxx:DisplayMode>SymbolOnly</gpxx:DisplayMode></gpxx:WaypointExtension>
+  </extensions></wpt>
+</gpx>
+'''
+
+
+def _load_without_lxml():
+    """A separate copy of poi_formats that falls back to ElementTree"""
+    spec = importlib.util.find_spec('poi_formats')
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {'lxml': None, 'lxml.etree': None}):
+        spec.loader.exec_module(module)
+    return module
+
+
+def _declared_namespaces(path):
+    """How often each namespace URI is declared in the file at path"""
+    return Counter(re.findall(r'xmlns(?::\w+)?="([^"]*)"', path.read_text(encoding='utf-8')))
+
+
+class TestReadMany(unittest.TestCase):
+    """Parallel reads must match serial reads, in input order."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.handler = GPXFileHandler()
+        self.paths = []
+        for i in range(PARALLEL_READ_MIN_FILES):
+            path = Path(self._tmp.name) / f'file{i}.gpx'
+            self.handler.write_gpx_file(path, [POI(lat=60.0 + i, lon=10.0, name=f'POI {i}')])
+            self.paths.append(path)
+
+    def test_worker_processes_with_module_reader(self):
+        results = self.handler.read_many(self.paths, workers=2, reader=read_poi_file)
+        self.assertEqual([[poi.name for poi in pois] for pois in results],
+                         [[f'POI {i}'] for i in range(len(self.paths))])
+
+    def test_missing_file_reads_as_empty(self):
+        self.assertEqual(read_poi_file(Path(self._tmp.name) / 'missing.gpx'), [])
+
+
+class TestWriteGPXFile(unittest.TestCase):
+    """A failed write must not destroy the file it was replacing."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.handler = GPXFileHandler()
+        self.path = Path(self._tmp.name) / 'keep.gpx'
+
+    def test_failed_write_keeps_existing_file(self):
+        pois = [POI(lat=60.0, lon=10.0, name='Hytte')]
+        self.handler.write_gpx_file(self.path, pois)
+        before = self.path.read_bytes()
+
+        def failing_pois():
+            yield from pois
+            raise RuntimeError('source failed mid-write')
+
+        with self.assertRaises(RuntimeError):
+            self.handler.write_gpx_file(self.path, failing_pois())
+
+        self.assertEqual(self.path.read_bytes(), before)
+        self.assertEqual(os.listdir(self._tmp.name), ['keep.gpx'])
+
+    def test_write_replaces_existing_file(self):
+        self.handler.write_gpx_file(self.path, [POI(lat=60.0, lon=10.0, name='Old')])
+        self.handler.write_gpx_file(self.path, [POI(lat=60.0, lon=10.0, name='New')])
+        self.assertEqual([poi.name for poi in self.handler.read_gpx_file(self.path)], ['New'])
+        self.assertEqual(os.listdir(self._tmp.name), ['keep.gpx'])
+
+
+class TestNamespaceDeclarations(unittest.TestCase):
+    """Each namespace is declared once, however many waypoints use it."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.source = Path(self._tmp.name) / 'garmin.gpx'
+        self.source.write_text(GARMIN_GPX, encoding='utf-8')
+        self.backends = [('ElementTree', _load_without_lxml())]
+        if poi_formats.LXML_SUPPORT:
+            self.backends.append(('lxml', poi_formats))
+
+    def test_garmin_writer_declares_each_namespace_once(self):
+        for backend, module in self.backends:
+            with self.subTest(backend=backend):
+                handler = module.GPXFileHandler()
+                path = Path(self._tmp.name) / f'{backend}.garmin.gpx'
+                handler.write_garmin_optimized_gpx(path, handler.read_gpx_file(self.source))
+
+                declared = _declared_namespaces(path)
+                self.assertIn('http://www.garmin.com/xmlschemas/GpxExtensions/v3', declared)
+                self.assertEqual([uri for uri, count in declared.items() if count > 1], [])
+
+                text = path.read_text(encoding='utf-8')
+                self.assertEqual(text.count('SymbolOnly'), 1)
+                self.assertEqual(len(handler.read_gpx_file(path)), 2)
+
+    def test_gpx_writer_declares_root_namespaces_once(self):
+        for backend, module in self.backends:
+            with self.subTest(backend=backend):
+                handler = module.GPXFileHandler()
+                path = Path(self._tmp.name) / f'{backend}.gpx'
+                handler.write_gpx_file(path, handler.read_gpx_file(self.source))
+
+                declared = _declared_namespaces(path)
+                self.assertEqual(declared['http://www.topografix.com/GPX/1/1'], 1)
+                self.assertEqual(declared['http://www.w3.org/2001/XMLSchema-instance'], 1)
+                if backend == 'ElementTree':
+                    # The whole tree is built, so the root declares everything
+                    self.assertEqual(max(declared.values()), 1)
+
+                pois = handler.read_gpx_file(path)
+                self.assertEqual([poi.name for poi in pois], ['Hytte 1', 'Hytte 2'])
+                self.assertIn('SymbolOnly', pois[1].extensions)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Tests for GPXManager."""
+
+import pickle
+import unittest
+
+import requests
+
+from poi_manager import ELEVATION_REQUEST_INTERVAL, GPXManager, _RequestPacer
+
+
+class TestGPXManagerPickling(unittest.TestCase):
+    """read_many sends its reader to worker processes, so it must pickle."""
+
+    def test_read_gpx_file_pickles(self):
+        manager = GPXManager()
+        reader = pickle.loads(pickle.dumps(manager.read_gpx_file))
+        self.assertEqual(reader.__self__.duplicate_threshold, manager.duplicate_threshold)
+
+    def test_pickles_after_session_is_created(self):
+        manager = GPXManager()
+        # What lookup_elevations sets up on first use
+        manager._elevation_session = requests.Session()
+        manager._elevation_pacer = _RequestPacer(ELEVATION_REQUEST_INTERVAL)
+        restored = pickle.loads(pickle.dumps(manager))
+        self.assertIsNone(restored._elevation_session)
+        self.assertIsNone(restored._elevation_pacer)
+
+
+if __name__ == '__main__':
+    unittest.main()